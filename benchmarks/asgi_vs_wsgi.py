@@ -0,0 +1,94 @@
+"""
+Compares the sync (WSGI) and async (ASGI) vote-casting and results views
+under the same simulated load: every virtual client casts one vote and then
+reads the competition results, `--iterations` times.
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 50 --iterations 20
+"""
+import json
+from datetime import timedelta
+
+from benchmarks.harness import (
+    build_parser, print_table, run_async, run_threaded, setup_django, test_database,
+)
+
+
+def create_fixtures(concurrency):
+    from django.utils import timezone
+    from core.models import Company, Competition, CustomUser
+
+    company = Company.objects.create(name='Benchmark Inc.')
+    today = timezone.localdate()
+    users = CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench{i}', company=company) for i in range(concurrency + 5)
+    )
+    # Created by one of the voters, so the competition belongs to their company
+    # and they may read its results.
+    competition = Competition.objects.create(
+        name='Benchmark', creator=users[0], start_date=today - timedelta(days=1), end_date=today + timedelta(days=1),
+    )
+    return competition, users[:concurrency], users[concurrency:]
+
+
+def reset_votes(competition):
+    from core.models import Vote, VoteTally
+
+    Vote.objects.filter(competition=competition).delete()
+    VoteTally.objects.filter(competition=competition).delete()
+
+
+def vote_payload(competition, nominees, worker, i):
+    return json.dumps({
+        'competition': competition.pk,
+        'title': f'Category {i}',
+        'nominee': nominees[(worker + i) % len(nominees)].pk,
+    })
+
+
+def main():
+    parser = build_parser(__doc__)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+    setup_django(args.settings)
+
+    from django.test import AsyncClient, Client
+    from django.urls import reverse
+
+    with test_database():
+        competition, voters, nominees = create_fixtures(args.concurrency)
+
+        def make_sync_task(worker):
+            client = Client()
+            client.force_login(voters[worker])
+            votes_url = reverse('core:cast-votes')
+            results_url = reverse('core:competition-results', args=[competition.pk])
+
+            def task(i):
+                client.post(votes_url, vote_payload(competition, nominees, worker, i), content_type='application/json')
+                client.get(results_url)
+            return task
+
+        def make_async_task(worker):
+            client = AsyncClient()
+            client.force_login(voters[worker])
+            votes_url = reverse('core:cast-votes-async')
+            results_url = reverse('core:competition-results-async', args=[competition.pk])
+
+            async def task(i):
+                await client.post(
+                    votes_url, vote_payload(competition, nominees, worker, i), content_type='application/json',
+                )
+                await client.get(results_url)
+            return task
+
+        rows = {}
+        rows['wsgi'] = run_threaded(make_sync_task, args.concurrency, args.iterations)
+        reset_votes(competition)
+        rows['asgi'] = run_async(make_async_task, args.concurrency, args.iterations)
+
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
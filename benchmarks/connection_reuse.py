@@ -0,0 +1,77 @@
+"""
+Measures request latency with a new database connection per request
+(CONN_MAX_AGE=0) against reusing the worker's connection (CONN_MAX_AGE
+from --max-age, with CONN_HEALTH_CHECKS). Requests go straight through the
+WSGI handler so Django's connection lifecycle signals run as in production
+(the test client disables them).
+
+Point DB_HOST/DB_PORT at PostgreSQL, or at PgBouncer with DB_POOLER=pgbouncer,
+to see the handshake cost this is about; SQLite connections are nearly free.
+The "new connection" row is what the default ASGI setup pays per request, so
+running it inside the compose stack before and after pointing DB_HOST at the
+pgbouncer service shows what the pooler saves:
+
+    python -m benchmarks.connection_reuse --requests 500
+    DB_HOST=db DB_PORT=5432 DB_POOLER= python -m benchmarks.connection_reuse --requests 500
+"""
+import io
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.harness import build_parser, print_table, run_threaded, setup_django, test_database
+
+
+def wsgi_get(application, path, cookie=''):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.input': io.BytesIO(), 'HTTP_COOKIE': cookie}
+    setup_testing_defaults(environ)
+    status = []
+    body = b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+    if not status[0].startswith('200'):
+        raise RuntimeError(f'{path} answered {status[0]}: {body[:200]!r}')
+
+
+def main():
+    parser = build_parser(__doc__)
+    parser.add_argument('--requests', type=int, default=300, help='Requests per worker thread')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--max-age', type=int, default=60, help='CONN_MAX_AGE for the reuse run')
+    args = parser.parse_args()
+    setup_django(args.settings)
+
+    from datetime import date
+
+    from django.conf import settings
+    from django.db import connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from config.wsgi import application
+    from core.models import Competition, CustomUser
+
+    with test_database():
+        competition = Competition.objects.create(
+            name='Benchmark', start_date=date(2024, 1, 1), end_date=date(2024, 12, 31),
+        )
+        path = reverse('core:competition-results', args=[competition.pk])
+        # The results endpoint needs a logged-in user; reuse one session cookie.
+        client = Client()
+        client.force_login(CustomUser.objects.create(username='bench_staff', is_staff=True))
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        settings_dict = connections['default'].settings_dict
+
+        rows = {}
+        for label, max_age in (('new connection', 0), (f'reuse ({args.max_age}s)', args.max_age)):
+            settings_dict['CONN_MAX_AGE'] = max_age
+            settings_dict['CONN_HEALTH_CHECKS'] = bool(max_age)
+            connections.close_all()
+            wsgi_get(application, path, cookie)  # warm-up: URL resolver, cache entry
+
+            def make_task(worker):
+                return lambda i: wsgi_get(application, path, cookie)
+
+            rows[label] = run_threaded(make_task, args.concurrency, args.requests)
+
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
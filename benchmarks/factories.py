@@ -0,0 +1,150 @@
+"""
+Bulk factories for benchmark data: companies with their users, one
+competition per company, and votes spread over a few categories. Rows are
+inserted with bulk_create in batches, so millions of votes stay within
+memory; tallies are rebuilt once at the end, since bulk_create does not send
+the signals that maintain them.
+
+Nominees are drawn with a skewed distribution (a few popular colleagues
+collect most votes), which is closer to real results than a uniform spread.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+
+TITLES = (
+    'Most Helpful', 'Best Mentor', 'Team Player', 'Innovator', 'Rising Star',
+    'Problem Solver', 'Customer Hero', 'Best Presenter', 'Quiet Achiever', 'Culture Champion',
+)
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    votes: int
+    companies: list
+    competitions: list
+    staff: object
+    # Open competition with no votes yet, and users of its company who have
+    # not voted, for ingestion benchmarks.
+    open_competition: object = None
+    fresh_voters: list = field(default_factory=list)
+
+    @property
+    def largest_competition(self):
+        return self.competitions[0]
+
+
+def _batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def make_companies(count, prefix='Bench'):
+    from core.models import Company
+
+    names = [f'{prefix} Company {i}' for i in range(count)]
+    Company.objects.bulk_create([Company(name=name) for name in names])
+    return list(Company.objects.filter(name__in=names).order_by('pk'))
+
+
+def make_users(company, count, prefix):
+    """Creates `count` users for a company; returns their ids in creation order."""
+    from django.contrib.auth.hashers import make_password
+    from core.models import CustomUser
+
+    # Hashing is the slow part of creating users; they never log in here.
+    password = make_password(None)
+    for batch in _batched(range(count)):
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'{prefix}{i}', company=company, password=password) for i in batch
+        )
+    return list(CustomUser.objects.filter(company=company).order_by('pk').values_list('pk', flat=True))
+
+
+def make_competition(name, creator_id, start_date, end_date):
+    from core.models import Competition
+
+    return Competition.objects.create(
+        name=name, creator_id=creator_id, start_date=start_date, end_date=end_date,
+    )
+
+
+def iter_votes(competition, user_ids, titles, count, rng):
+    """
+    Yields up to `count` unsaved votes: each voter votes once per title, for
+    a nominee other than themselves.
+    """
+    from core.models import Vote
+
+    produced = 0
+    for voter_id in user_ids:
+        for title in titles:
+            if produced == count:
+                return
+            nominee_id = voter_id
+            while nominee_id == voter_id:
+                rank = min(int(rng.paretovariate(1.2)) - 1, len(user_ids) - 1)
+                nominee_id = user_ids[rank]
+            yield Vote(
+                competition_id=competition.pk, company_id=competition.company_id, title=title,
+                voter_id=voter_id, nominee_id=nominee_id, is_public=rng.random() > 0.1,
+            )
+            produced += 1
+
+
+def make_votes(competition, user_ids, count, titles=TITLES, rng=None):
+    from core.models import Vote
+
+    rng = rng or random.Random(0)
+    for batch in _batched(iter_votes(competition, user_ids, titles, count, rng)):
+        Vote.objects.bulk_create(batch)
+
+
+def build_dataset(votes, companies=5, titles=TITLES, fresh_voters=50, seed=0):
+    """
+    Creates `companies` companies, each with one closed competition, sharing
+    `votes` votes between them (the first competition gets the remainder and
+    is the largest). Users are created as needed for every voter to cast one
+    vote per title. Also creates an open competition for ingestion runs.
+    """
+    from django.utils import timezone
+    from core.models import CustomUser
+    from core.tallies import rebuild_tallies
+
+    rng = random.Random(seed)
+    today = timezone.localdate()
+    per_company = votes // companies
+    users_per_company = max(2, -(-(per_company + votes % companies) // len(titles)))
+
+    company_rows = make_companies(companies)
+    competitions = []
+    for index, company in enumerate(company_rows):
+        user_ids = make_users(company, users_per_company, prefix=f'bench{index}_')
+        competition = make_competition(
+            f'{company.name} awards', user_ids[0], today - timedelta(days=60), today - timedelta(days=30),
+        )
+        count = per_company + (votes % companies if index == 0 else 0)
+        make_votes(competition, user_ids, count, titles, rng)
+        competitions.append(competition)
+    rebuild_tallies()
+
+    first = company_rows[0]
+    voter_ids = make_users(first, fresh_voters, prefix='fresh_')[-fresh_voters:]
+    open_competition = make_competition(
+        f'{first.name} open', voter_ids[0], today - timedelta(days=1), today + timedelta(days=30),
+    )
+    staff = CustomUser.objects.create(username='bench_staff', is_staff=True, is_superuser=True)
+    return Dataset(
+        votes=votes,
+        companies=company_rows,
+        competitions=competitions,
+        staff=staff,
+        open_competition=open_competition,
+        fresh_voters=list(CustomUser.objects.filter(pk__in=voter_ids).order_by('pk')),
+    )
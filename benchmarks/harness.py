@@ -0,0 +1,128 @@
+"""
+Shared helpers for the scripts in this package. Every benchmark runs
+against a throwaway test database created from the configured settings, so
+it never touches real data and needs no network service beyond the
+database itself.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+def build_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--settings', help='Django settings module (defaults to DJANGO_SETTINGS_MODULE or config.settings)',
+    )
+    return parser
+
+
+def setup_django(settings_module=None):
+    if settings_module:
+        os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+        # The default shared-cache in-memory database fails concurrent writers
+        # with "table is locked"; a file database waits on its busy timeout.
+        test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'benchmarks.sqlite3')
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed):
+    """Latency percentiles in milliseconds plus overall throughput."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def run_threaded(make_task, concurrency, iterations):
+    """
+    Runs `iterations` calls of a task per worker thread, `concurrency` threads
+    at once. make_task(worker) returns the callable for one worker, which is
+    called with the iteration number.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    tasks = [make_task(worker) for worker in range(concurrency)]
+
+    def worker(task):
+        local = []
+        try:
+            for i in range(iterations):
+                started = time.perf_counter()
+                task(i)
+                local.append(time.perf_counter() - started)
+        except Exception as exc:
+            errors.append(exc)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(task,)) for task in tasks]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_async(make_task, concurrency, iterations):
+    """Same as run_threaded, with `concurrency` coroutines on one event loop."""
+    tasks = [make_task(worker) for worker in range(concurrency)]
+
+    async def worker(task):
+        local = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            await task(i)
+            local.append(time.perf_counter() - started)
+        return local
+
+    async def main():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(worker(task) for task in tasks))
+        return [latency for local in results for latency in local], time.perf_counter() - started
+
+    latencies, elapsed = asyncio.run(main())
+    return summarize(latencies, elapsed)
+
+
+def print_table(rows, columns=('requests', 'p50_ms', 'p99_ms', 'mean_ms', 'rps')):
+    width = max(len(name) for name in rows)
+    print(' ' * width + ''.join(f'{column:>12}' for column in columns))
+    for name, stats in rows.items():
+        print(f'{name:<{width}}' + ''.join(f'{stats[column]:>12}' for column in columns))
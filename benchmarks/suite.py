@@ -0,0 +1,206 @@
+"""
+Times the main read and write paths at several data sizes and compares them
+against a stored JSON baseline:
+
+- get_winner: computing a competition's results (uncached).
+- admin_*: the Vote and user changelists, plain and with a search.
+- cast_votes: validating and storing one batch of votes (one per category).
+- export_*: streaming a competition's votes and results as CSV.
+- nominee_search: an autocomplete lookup in the largest company (index built
+  during the warm-up call).
+
+Each size gets its own throwaway database, filled by benchmarks.factories.
+Record a baseline on a quiet machine, then compare later runs against it;
+the run exits with status 1 when a case's p50 is slower than the baseline
+by more than --tolerance (and by more than --min-delta-ms, to ignore noise
+on sub-millisecond cases). Sizes below --compare-min-size are timed and
+printed but never fail the run: at 1000 votes the noise between two runs
+on the same commit is larger than the tolerance.
+
+    python -m benchmarks.suite --sizes 10000,100000 --save
+    python -m benchmarks.suite --sizes 10000,100000 --compare
+    python -m benchmarks.suite --sizes 1000000 --repeat 3
+
+Baselines default to benchmarks/baselines/<database vendor>.json, since
+SQLite and PostgreSQL numbers are not comparable.
+"""
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.harness import build_parser, print_table, setup_django, summarize, test_database
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+DEFAULT_SIZES = '1000,10000,100000'
+
+
+def time_calls(task, repeat):
+    """Calls task(i) `repeat` times in this thread and summarizes the latencies."""
+    latencies = []
+    started = time.perf_counter()
+    for i in range(repeat):
+        call_started = time.perf_counter()
+        task(i)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def admin_get(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} answered {response.status_code}')
+
+
+def run_cases(dataset, repeat):
+    from django.test import Client
+    from django.urls import reverse
+
+    from core.exports import export_lines
+    from core.nominees import search_nominees
+    from core.services import get_winner
+    from core.voting import cast_votes
+    from benchmarks.factories import TITLES
+
+    competition_id = dataset.largest_competition.pk
+    company_id = dataset.companies[0].pk
+    client = Client()
+    client.force_login(dataset.staff)
+    vote_changelist = reverse('admin:core_vote_changelist')
+    user_changelist = reverse('admin:core_customuser_changelist')
+    nominees = [voter.pk for voter in dataset.fresh_voters]
+
+    def cast_batch(i):
+        voter = dataset.fresh_voters[i % len(dataset.fresh_voters)]
+        items = [
+            {
+                'competition': dataset.open_competition.pk,
+                'title': title,
+                'nominee': nominees[(i + 1 + n) % len(nominees)],
+            }
+            for n, title in enumerate(TITLES)
+        ]
+        results = cast_votes(voter, items)
+        if any(result['status'] != 'created' for result in results):
+            raise RuntimeError(f'cast_votes rejected votes: {results}')
+
+    def export(kind):
+        def task(i):
+            for _ in export_lines(competition_id, kind, 'csv'):
+                pass
+        return task
+
+    cases = {
+        'get_winner': lambda i: get_winner(competition_id),
+        'admin_vote_changelist': lambda i: admin_get(client, vote_changelist),
+        'admin_vote_search': lambda i: admin_get(client, f'{vote_changelist}?q=bench0_1'),
+        'admin_user_changelist': lambda i: admin_get(client, user_changelist),
+        'cast_votes': cast_batch,
+        'export_votes_csv': export('votes'),
+        'export_results_csv': export('results'),
+        'nominee_search': lambda i: search_nominees(company_id, f'bench0_{i % 10}'),
+    }
+    results = {}
+    for name, task in cases.items():
+        task(0)  # warm-up: query compilation, template loading
+        if name == 'cast_votes':
+            # The warm-up used the first voter; start over with a clean slate.
+            dataset.open_competition.vote_set.all().delete()
+        results[name] = time_calls(task, min(repeat, len(dataset.fresh_voters)) if name == 'cast_votes' else repeat)
+    return results
+
+
+def compare(current, baseline, tolerance, min_delta_ms, min_size=0):
+    """
+    Returns a list of human-readable regressions of `current` against
+    `baseline`. Sizes below `min_size` are left out: their timings are short
+    enough that run-to-run noise exceeds any useful tolerance.
+    """
+    regressions = []
+    for size, cases in current.items():
+        if int(size) < min_size:
+            continue
+        for name, stats in cases.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            before, after = reference['p50_ms'], stats['p50_ms']
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                regressions.append(f'{name} @ {size} votes: p50 {before}ms -> {after}ms')
+    return regressions
+
+
+def main():
+    parser = build_parser(__doc__)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma-separated vote counts')
+    parser.add_argument('--companies', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=30, help='Timed calls per case')
+    parser.add_argument('--baseline', help='Baseline file (default: benchmarks/baselines/<vendor>.json)')
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='Fail if slower than the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    parser.add_argument(
+        '--compare-min-size', type=int, default=10000, help='Smallest vote count --compare fails on',
+    )
+    args = parser.parse_args()
+    setup_django(args.settings)
+
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    from benchmarks.factories import build_dataset
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f'{connection.vendor}.json')
+    sizes = [int(size) for size in args.sizes.split(',')]
+    overrides = override_settings(
+        # The admin needs static files, which the manifest storage only has after collectstatic.
+        STORAGES={
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        },
+        PERF_INSTRUMENTATION=False,
+    )
+
+    results = {}
+    with overrides:
+        for size in sizes:
+            with test_database():
+                started = time.perf_counter()
+                dataset = build_dataset(size, companies=args.companies)
+                print(f'{size} votes: dataset built in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+                results[str(size)] = run_cases(dataset, args.repeat)
+            print(f'\n{size} votes')
+            print_table(results[str(size)])
+
+    if args.compare:
+        with open(baseline_path) as handle:
+            baseline = json.load(handle)['results']
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms, args.compare_min_size)
+        if regressions:
+            print('\nRegressions against ' + baseline_path)
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print(f'\nNo regressions against {baseline_path}')
+
+    if args.save:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as handle:
+            json.dump({
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'repeat': args.repeat,
+                'companies': args.companies,
+                'results': results,
+            }, handle, indent=2)
+            handle.write('\n')
+        print(f'\nBaseline written to {baseline_path}')
+
+
+if __name__ == '__main__':
+    main()
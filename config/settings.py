@@ -63,8 +63,10 @@ INSTALLED_APPS = CORE_APPS + LOCAL_APPS
 AUTH_USER_MODEL = 'core.CustomUser'
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -96,6 +98,24 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse:
+# - DB_CONN_MAX_AGE: seconds a worker keeps its connection open ('None' =
+#   forever, 0 = close after each request). Under WSGI it defaults to 60.
+#   Under ASGI (SERVER_INTERFACE=asgi, see entrypoint.sh) requests run in
+#   short-lived threads, so persistent connections would pile up; there it
+#   defaults to 0 and reuse comes from PgBouncer: the image runs one next to
+#   the server (entrypoint.sh) and docker-compose.yml runs it as a service.
+#   `manage.py preflight` refuses to start ASGI against PostgreSQL without it.
+# - DB_POOLER=pgbouncer: DB_HOST/DB_PORT point at PgBouncer in transaction
+#   mode. Server-side cursors are disabled because they cannot outlive the
+#   pooled transaction, so iterator() then loads whole result sets; code that
+#   streams large reads (core.exports) pages by keyset instead.
+# - DB_POOLER=bundled (the entrypoint's ASGI default) starts the image's own
+#   PgBouncer and becomes 'pgbouncer'; 'none' runs without a pooler on purpose.
+SERVER_INTERFACE = os.getenv('SERVER_INTERFACE') or 'asgi'
+DB_POOLER = os.getenv('DB_POOLER', '')
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE') or ('60' if SERVER_INTERFACE == 'wsgi' else '0')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -104,9 +124,118 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'challenger_password'),
         'HOST': os.getenv('DB_HOST', 'db'), # 'db' es el nombre del servicio en docker-compose
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': None if DB_CONN_MAX_AGE == 'None' else int(DB_CONN_MAX_AGE),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOLER == 'pgbouncer',
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT') or '5'),
+        },
     }
 }
 
+# Optional read replica for results, exports and listings (see core/routers.py).
+# Without DB_REPLICA_HOST every query goes to 'default'.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS') or '10')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Redis is shared by every Cloud Run instance; without it each process keeps
+# its own local-memory cache (enough for development and tests).
+
+REDIS_URL = os.getenv('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'voting-app',
+        }
+    }
+
+RESULTS_CACHE_TIMEOUT = int(os.getenv('RESULTS_CACHE_TIMEOUT', '300'))
+
+# Vote casting limits (core.throttling), as "<requests>/<s|m|h|d>" token
+# buckets per user and per company; empty disables a limit. Rate limits and
+# the "already voted" sets only hold across instances with Redis.
+VOTE_THROTTLE_USER = os.getenv('VOTE_THROTTLE_USER', '30/m')
+VOTE_THROTTLE_COMPANY = os.getenv('VOTE_THROTTLE_COMPANY', '1000/m')
+VOTED_CACHE_TIMEOUT = int(os.getenv('VOTED_CACHE_TIMEOUT') or '3600')
+
+# VOTE_INGEST_MODE=buffered queues accepted votes in a local SQLite file
+# (core.vote_buffer) and answers 202; `manage.py flush_vote_buffer` must run
+# on the same machine to move them to the database in batches.
+VOTE_INGEST_MODE = os.getenv('VOTE_INGEST_MODE') or 'direct'
+VOTE_BUFFER_PATH = os.getenv('VOTE_BUFFER_PATH') or os.path.join(BASE_DIR, 'vote_buffer.sqlite3')
+
+
+# Live results (core.live): 'local' only streams changes written by the same
+# process; 'postgres' relays them between instances with LISTEN/NOTIFY, over
+# a direct connection to LIVE_RESULTS_LISTEN_HOST / LIVE_RESULTS_LISTEN_PORT
+# (default to DB_HOST / DB_PORT).
+LIVE_RESULTS_BACKEND = os.getenv('LIVE_RESULTS_BACKEND') or 'local'
+LIVE_RESULTS_LISTEN_HOST = os.getenv('LIVE_RESULTS_LISTEN_HOST', '')
+LIVE_RESULTS_LISTEN_PORT = os.getenv('LIVE_RESULTS_LISTEN_PORT', '')
+LIVE_RESULTS_HEARTBEAT = int(os.getenv('LIVE_RESULTS_HEARTBEAT') or '15')
+LIVE_RESULTS_MAX_SECONDS = int(os.getenv('LIVE_RESULTS_MAX_SECONDS') or '300')
+
+
+# Nominee autocomplete (core.nominees) keeps a prefix index per company in
+# each process; this bounds how many companies' indexes stay in memory
+# (roughly 50 MB per 100k users).
+NOMINEE_INDEX_MAX_COMPANIES = int(os.getenv('NOMINEE_INDEX_MAX_COMPANIES') or '32')
+
+
+# Admin changelists above this many rows show PostgreSQL's row estimate
+# instead of running an exact COUNT(*).
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
+
+# Performance instrumentation (core.middleware.PerformanceMiddleware)
+# Every request feeds the wall-time histograms served at /api/metrics/; only
+# a PERF_SAMPLE_RATE share (0 to 1) also counts queries, adds a Server-Timing
+# header and logs a JSON line. /api/metrics/ requires staff or
+# "Authorization: Bearer <METRICS_TOKEN>".
+
+PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', 'True') == 'True'
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE') or '0.1')
+PERF_SLOW_REQUEST_MS = int(os.getenv('PERF_SLOW_REQUEST_MS') or '500')
+PERF_SLOW_QUERY_MS = int(os.getenv('PERF_SLOW_QUERY_MS') or '100')
+PERF_DUPLICATE_QUERY_THRESHOLD = int(os.getenv('PERF_DUPLICATE_QUERY_THRESHOLD') or '5')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('PERF_LOG_LEVEL') or 'INFO',
+            'propagate': False,
+        },
+    },
+}
 
 
 # Password validation
@@ -148,7 +277,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'src'), # <--- AÑADE ESTA LÍNEA
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Static files are collected, hashed and precompressed (gzip and Brotli) when
+# the image is built (see Dockerfile); `manage.py preflight` refuses to start
+# without the manifest instead of rebuilding it at runtime.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# WhiteNoise serves hashed files with a ten-year immutable Cache-Control;
+# this only applies to files served under their unhashed names.
+WHITENOISE_MAX_AGE = 3600
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -1,6 +1,63 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib.auth.admin import UserAdmin
-from .models import Competition, Vote, Company, CustomUser
+from django.utils.text import smart_split, unescape_string_literal
+from .models import ArchivedVote, Competition, Vote, Company, CustomUser, ResultSnapshot
+from .pagination import EstimatedCountPaginator
+
+
+class RecentCompetitionFilter(admin.SimpleListFilter):
+    """Competition filter limited to the most recent ones, so the sidebar stays small."""
+    title = 'competition'
+    parameter_name = 'competition__id__exact'
+    limit = 20
+
+    def lookups(self, request, model_admin):
+        competitions = Competition.objects.order_by('-end_date', '-pk').values_list('pk', 'name')
+        return [(str(pk), name) for pk, name in competitions[:self.limit]]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                competition_id = int(self.value())
+            except ValueError:
+                # The changelist answers with its "?e=1" error page instead of a 500.
+                raise IncorrectLookupParameters(f'Invalid competition id: {self.value()!r}')
+            return queryset.filter(competition_id=competition_id)
+        return queryset
+
+
+class IndexedSearchMixin:
+    """
+    Changelist search that PostgreSQL can answer from the trigram indexes of
+    migrations 0004 and 0013. Django ORs every search field into one WHERE
+    across joins, which no single-table index can serve. Here each field
+    instead becomes a subquery of matching ids on its own table, so each one
+    can use its index (related fields through the foreign key's index). A
+    row matches a search term when its id is in the union of the subqueries.
+    Prefix or exact searches ('^', '=', '@') keep Django's implementation.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if not search_fields or not search_term or any(field[0] in '^=@' for field in search_fields):
+            return super().get_search_results(request, queryset, search_term)
+        for term in smart_split(search_term):
+            if term[0] in '"\'' and term[0] == term[-1]:
+                term = unescape_string_literal(term)
+            first, *rest = [_matching_ids(queryset.model, field, term) for field in search_fields]
+            queryset = queryset.filter(pk__in=first.union(*rest) if rest else first)
+        return queryset, False
+
+
+def _matching_ids(model, field, term):
+    """Ids of `model` rows whose `field` (possibly across relations) contains `term`."""
+    relation, _, rest = field.partition('__')
+    if not rest:
+        return model._base_manager.filter(**{f'{field}__icontains': term}).values('pk')
+    related = model._meta.get_field(relation).related_model
+    return model._base_manager.filter(**{f'{relation}__in': _matching_ids(related, rest, term)}).values('pk')
+
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
@@ -9,27 +66,79 @@ class CompanyAdmin(admin.ModelAdmin):
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(IndexedSearchMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         (None, {'fields': ('role', 'company')}),
     )
     list_display = UserAdmin.list_display + ('role', 'company',)
     list_filter = UserAdmin.list_filter + ('role', 'company',)
-    search_fields = UserAdmin.search_fields + ('role', 'company__name',)
+    list_select_related = ('company',)
+    # role has few values and no index; it is a list filter instead.
+    search_fields = UserAdmin.search_fields + ('company__name',)
+    autocomplete_fields = ('company',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_fields(self, request):
+        # Autocomplete widgets (a vote's voter or nominee, a competition's
+        # creator) match name prefixes, which the prefix indexes of migration
+        # 0011 answer without scanning; the changelist keeps icontains.
+        if request.resolver_match and request.resolver_match.url_name == 'autocomplete':
+            return ('^username', '^first_name', '^last_name',)
+        return super().get_search_fields(request)
 
 
 @admin.register(Competition)
-class CompetitionAdmin(admin.ModelAdmin):
-    list_display = ('name', 'start_date', 'end_date', 'creator',)
-    list_filter = ('start_date', 'end_date', 'creator__company',)
+class CompetitionAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('name', 'start_date', 'end_date', 'creator', 'company',)
+    list_filter = ('start_date', 'end_date', 'company',)
+    list_select_related = ('creator', 'company',)
     search_fields = ('name', 'creator__username',)
-    fields = ('name', 'start_date', 'end_date', 'creator',)
+    # The company follows the creator's when one is set (see Competition.save).
+    fields = ('name', 'start_date', 'end_date', 'creator', 'company',)
+    autocomplete_fields = ('creator', 'company',)
 
 
 @admin.register(Vote)
-class VoteAdmin(admin.ModelAdmin):
+class VoteAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'competition', 'voter', 'nominee', 'is_public',)
-    list_filter = ('competition', 'voter', 'nominee', 'is_public',)
+    # Filtering by voter/nominee would list every user in the sidebar; use search instead.
+    list_filter = (RecentCompetitionFilter, 'company', 'is_public',)
+    list_select_related = ('competition', 'voter', 'nominee',)
     search_fields = ('title', 'competition__name', 'voter__username', 'nominee__username',)
     fields = ('competition', 'title', 'description', 'award', 'is_public', 'voter', 'nominee',)
+    autocomplete_fields = ('competition', 'voter', 'nominee',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedVote)
+class ArchivedVoteAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    """Read-only: rows are written by `manage.py archive_votes`."""
+    list_display = ('title', 'competition', 'voter', 'nominee', 'is_public', 'archived_at',)
+    list_filter = (RecentCompetitionFilter, 'company', 'is_public',)
+    list_select_related = ('competition', 'voter', 'nominee',)
+    search_fields = ('title', 'competition__name', 'voter__username', 'nominee__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ResultSnapshot)
+class ResultSnapshotAdmin(admin.ModelAdmin):
+    """Read-only: snapshots are taken by `manage.py snapshot_results`. Delete one to retake it."""
+    list_display = ('competition', 'total_votes', 'created_at',)
+    list_select_related = ('competition',)
+    search_fields = ('competition__name',)
+    exclude = ('rows',)
+
+    def has_add_permission(self, request):
+        return False
 
+    def has_change_permission(self, request, obj=None):
+        return False
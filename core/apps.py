@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
-    verbose_name = 'Core Module'
\ No newline at end of file
+    verbose_name = 'Core Module'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
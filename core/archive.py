@@ -0,0 +1,76 @@
+"""
+Moves the votes of closed competitions from Vote to ArchivedVote.
+
+Tallies are frozen first: VoteTally is rebuilt from both tables, so results
+stay exact while votes move. Each batch copies a slice of votes into the
+archive and deletes them from Vote in one transaction, with a plain SQL
+DELETE that skips the signals which would otherwise take the votes off the
+tallies. A run that stops half way leaves every vote in exactly one table
+and simply continues on the next run; copies are idempotent on the
+original id.
+"""
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from core.models import ArchivedVote, Competition, Vote
+from core.tallies import rebuild_tallies
+
+ARCHIVED_FIELDS = (
+    'id', 'competition_id', 'company_id', 'title', 'description', 'award', 'is_public', 'voter_id', 'nominee_id',
+)
+DEFAULT_BATCH_SIZE = 5000
+
+
+def archivable_competitions(closed_before):
+    """Competitions that ended before `closed_before` and still have votes in the live table."""
+    return (
+        Competition.objects
+        .filter(end_date__lt=closed_before)
+        .filter(Q(votes_archived_at__isnull=True) | Exists(Vote.objects.filter(competition_id=OuterRef('pk'))))
+        .order_by('end_date', 'pk')
+    )
+
+
+def archive_batch(competition_id, batch_size=DEFAULT_BATCH_SIZE):
+    """Moves the competition's oldest `batch_size` votes. Returns how many moved."""
+    using = router.db_for_write(Vote)
+    with transaction.atomic(using=using):
+        rows = list(
+            Vote.objects.using(using)
+            .filter(competition_id=competition_id)
+            .order_by('pk')
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ArchivedVote.objects.using(using).bulk_create(
+            [ArchivedVote(**row) for row in rows], ignore_conflicts=True
+        )
+        _delete_votes(using, [row['id'] for row in rows])
+    return len(rows)
+
+
+def _delete_votes(using, ids):
+    connection = connections[using]
+    table = connection.ops.quote_name(Vote._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DELETE FROM {table} WHERE id = ANY(%s)', [ids])
+        else:
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(ids))})', ids)
+
+
+def archive_competition(competition_id, batch_size=DEFAULT_BATCH_SIZE, log=None):
+    """Freezes the competition's tallies and archives all of its votes. Returns the votes moved."""
+    rebuild_tallies([competition_id])
+    total = 0
+    while True:
+        moved = archive_batch(competition_id, batch_size)
+        if not moved:
+            break
+        total += moved
+        if log:
+            log(f'competition {competition_id}: {total} votes archived')
+    Competition.objects.filter(pk=competition_id).update(votes_archived_at=timezone.now())
+    return total
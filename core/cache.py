@@ -0,0 +1,167 @@
+"""
+Read-through cache for results and competition metadata.
+
+Keys are versioned per scope (e.g. ``competition:42``): invalidating a scope
+bumps its version, which orphans every entry computed under the old one.
+Concurrent misses on the same key are collapsed with a short-lived lock
+stored in the cache itself, so it works across processes when the backend
+is shared (Redis) and within one process with the local-memory backend.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'core'
+DEFAULT_TIMEOUT = getattr(settings, 'RESULTS_CACHE_TIMEOUT', 300)
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.02
+
+_MISSING = object()
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name, event):
+    with _stats_lock:
+        _stats[(name, event)] += 1
+
+
+def cache_stats():
+    """{name: {'hit': n, 'miss': n, 'compute': n}} for this process."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    stats = {}
+    for (name, event), value in snapshot.items():
+        stats.setdefault(name, {'hit': 0, 'miss': 0, 'compute': 0})[event] = value
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def _initial_version():
+    # Time-based so a version evicted from the cache never restarts at a
+    # value whose entries could still be cached.
+    return int(time.time() * 1000)
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+async def aget_version(scope):
+    key = _version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial_version(), None)
+        version = await cache.aget(key, _initial_version())
+    return version
+
+
+def bump_version(scope):
+    key = _version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def _entry_key(scope, name, version, variant):
+    key = f'{KEY_PREFIX}:{name}:{scope}:{version}'
+    return f'{key}:{variant}' if variant is not None else key
+
+
+def get_or_compute(scope, name, compute, timeout=DEFAULT_TIMEOUT, variant=None):
+    """
+    Returns the cached value of `name` for `scope` (and optional `variant`,
+    e.g. a date), calling `compute()` on a miss. Only one caller recomputes
+    a given key at a time; the others wait up to LOCK_WAIT seconds for its
+    result before computing themselves.
+    """
+    key = _entry_key(scope, name, get_version(scope), variant)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _count(name, 'hit')
+        return value
+    _count(name, 'miss')
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        _count(name, 'compute')
+        return compute()
+
+    try:
+        _count(name, 'compute')
+        value = compute()
+        cache.set(key, value, timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+async def aget_or_compute(scope, name, compute, timeout=DEFAULT_TIMEOUT, variant=None):
+    """Async variant of get_or_compute; `compute` is a coroutine function."""
+    key = _entry_key(scope, name, await aget_version(scope), variant)
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        _count(name, 'hit')
+        return value
+    _count(name, 'miss')
+
+    lock_key = f'{key}:lock'
+    if not await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await cache.aget(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        _count(name, 'compute')
+        return await compute()
+
+    try:
+        _count(name, 'compute')
+        value = await compute()
+        await cache.aset(key, value, timeout)
+        return value
+    finally:
+        await cache.adelete(lock_key)
+
+
+COMPETITIONS_SCOPE = 'competitions'
+
+
+def competition_scope(competition_id):
+    return f'competition:{competition_id}'
+
+
+def invalidate_competition_cache(competition_id):
+    """Drops cached results for a competition once the current transaction commits."""
+    transaction.on_commit(lambda: bump_version(competition_scope(competition_id)))
+
+
+def invalidate_competition_list():
+    transaction.on_commit(lambda: bump_version(COMPETITIONS_SCOPE))
@@ -0,0 +1,48 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.checks import Error, Tags, Warning, register
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def static_manifest_missing():
+    """True when the static storage needs a manifest and collectstatic has not written it."""
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return False
+    return not os.path.exists(staticfiles_storage.path(staticfiles_storage.manifest_name))
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_static_manifest(app_configs, **kwargs):
+    if static_manifest_missing():
+        return [Error(
+            'The static files manifest is missing.',
+            hint='Static files are collected when the image is built; run collectstatic in the Dockerfile.',
+            id='core.E001',
+        )]
+    return []
+
+
+def connection_pooling_missing(connection):
+    """
+    True when every request opens a new PostgreSQL connection: ASGI, where
+    CONN_MAX_AGE stays 0 (see config/settings.py), without PgBouncer.
+    """
+    return (
+        connection.vendor == 'postgresql'
+        and getattr(settings, 'SERVER_INTERFACE', 'asgi') == 'asgi'
+        and getattr(settings, 'DB_POOLER', '') != 'pgbouncer'
+        and not connection.settings_dict.get('CONN_MAX_AGE')
+    )
+
+
+@register(Tags.database, deploy=True)
+def check_connection_pooling(app_configs, **kwargs):
+    if connection_pooling_missing(connections[DEFAULT_DB_ALIAS]):
+        return [Warning(
+            'ASGI without a connection pooler opens a PostgreSQL connection per request.',
+            hint='Run PgBouncer (DB_POOLER=pgbouncer, or the bundled one started by entrypoint.sh).',
+            id='core.W002',
+        )]
+    return []
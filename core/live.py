@@ -0,0 +1,189 @@
+"""
+Fan-out of tally changes to live result streams (see competition_live_view).
+
+Every committed tally change is published once per process and copied to
+each subscriber's queue, so N open streams cost one publish per change
+rather than N result queries per poll. Subscribers are asyncio queues owned
+by the event loop serving the stream; publishers run in sync code (signals,
+save_votes) and hand events over with call_soon_threadsafe.
+
+With LIVE_RESULTS_BACKEND = 'local' (default) only streams served by the
+process that wrote the votes see them. With 'postgres', changes go through
+NOTIFY inside the writing transaction, and each process runs one LISTEN
+thread that feeds its local subscribers, so every instance sees every
+change. LISTEN needs a session-level connection: point it at PostgreSQL
+itself, not at PgBouncer in transaction mode (LIVE_RESULTS_LISTEN_HOST).
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'vote_tallies'
+QUEUE_SIZE = 100
+# NOTIFY payloads must stay under 8000 bytes.
+NOTIFY_CHUNK_SIZE = 50
+
+
+class Subscription:
+    def __init__(self, competition_id):
+        self.competition_id = competition_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        # Set when events were dropped; the stream then sends a new snapshot.
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        return await self.queue.get()
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class Broker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, competition_id):
+        """Must be called from the event loop that will read the subscription."""
+        subscription = Subscription(competition_id)
+        with self.lock:
+            self.subscriptions[competition_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.competition_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.competition_id]
+
+    def publish(self, competition_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(competition_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:  # the stream's event loop is gone
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+def backend():
+    return getattr(settings, 'LIVE_RESULTS_BACKEND', 'local')
+
+
+def _events(deltas):
+    """{competition_id: [{'title', 'nominee', 'delta'}, ...]} from tally deltas."""
+    events = defaultdict(list)
+    for (competition_id, title, nominee_id), delta in deltas.items():
+        if delta:
+            events[competition_id].append({'title': title, 'nominee': nominee_id, 'delta': delta})
+    return events
+
+
+def publish_tally_deltas(deltas, versions):
+    """
+    Publishes tally_key -> delta changes once the current transaction
+    commits, each event stamped with the competition's results_version
+    after the change (`versions`), so streams can skip changes their
+    snapshot already includes. Called by apply_tally_deltas, so every write
+    path is covered.
+    """
+    events = _events(deltas)
+    if not events:
+        return
+    if backend() == 'postgres' and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for competition_id, changes in events.items():
+                for start in range(0, len(changes), NOTIFY_CHUNK_SIZE):
+                    payload = {
+                        'competition': competition_id,
+                        'version': versions.get(competition_id),
+                        'changes': changes[start:start + NOTIFY_CHUNK_SIZE],
+                    }
+                    cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(payload)])
+        return
+
+    def send():
+        for competition_id, changes in events.items():
+            broker.publish(competition_id, {
+                'competition': competition_id, 'version': versions.get(competition_id), 'changes': changes,
+            })
+    transaction.on_commit(send)
+
+
+class Listener(threading.Thread):
+    """Relays NOTIFY payloads from PostgreSQL to this process's broker."""
+
+    def __init__(self):
+        super().__init__(name='live-results-listener', daemon=True)
+
+    def run(self):
+        import psycopg2
+
+        params = connection.get_connection_params()
+        if getattr(settings, 'LIVE_RESULTS_LISTEN_HOST', ''):
+            params['host'] = settings.LIVE_RESULTS_LISTEN_HOST
+        if getattr(settings, 'LIVE_RESULTS_LISTEN_PORT', ''):
+            params['port'] = settings.LIVE_RESULTS_LISTEN_PORT
+        while True:
+            listen = None
+            try:
+                listen = psycopg2.connect(**params)
+                listen.autocommit = True
+                listen.cursor().execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([listen], [], [], 30) == ([], [], []):
+                        continue
+                    listen.poll()
+                    while listen.notifies:
+                        payload = json.loads(listen.notifies.pop(0).payload)
+                        broker.publish(payload['competition'], payload)
+            except Exception:
+                logger.exception('Live results listener failed; reconnecting.')
+                if listen is not None:
+                    listen.close()
+                threading.Event().wait(5)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Starts this process's LISTEN thread the first time a stream opens (postgres backend only)."""
+    global _listener
+    if backend() != 'postgres' or connection.vendor != 'postgresql':
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = Listener()
+            _listener.start()
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
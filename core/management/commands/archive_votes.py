@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.archive import DEFAULT_BATCH_SIZE, archivable_competitions, archive_competition
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves the votes of closed competitions to the archive table in batches. '
+        'Safe to interrupt and re-run: it resumes where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-days', type=int, default=7,
+            help='Only archive competitions that ended at least this many days ago',
+        )
+        parser.add_argument(
+            '--competition', type=int, action='append', dest='competitions',
+            help='Limit to this competition id (can be repeated)',
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='List the competitions that would be archived')
+
+    def handle(self, *args, grace_days, competitions, batch_size, dry_run, **options):
+        closed_before = timezone.localdate() - timedelta(days=grace_days)
+        queryset = archivable_competitions(closed_before)
+        if competitions:
+            queryset = queryset.filter(pk__in=competitions)
+
+        started = time.monotonic()
+        total = 0
+        for competition in queryset.only('pk', 'name', 'end_date'):
+            if dry_run:
+                self.stdout.write(f'Would archive {competition.name} (#{competition.pk}, ended {competition.end_date})')
+                continue
+            moved = archive_competition(competition.pk, batch_size, log=self.stdout.write)
+            total += moved
+            self.stdout.write(f'Archived {moved} votes of {competition.name} (#{competition.pk})')
+
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS(
+                f'Archived {total} votes in {time.monotonic() - started:.2f}s.'
+            ))
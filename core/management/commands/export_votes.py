@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, export_lines
+from core.models import Competition
+
+
+class Command(BaseCommand):
+    help = "Streams a competition's votes or results as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_id', type=int)
+        parser.add_argument('--kind', choices=sorted(EXPORTS), default='votes')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv', dest='fmt')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--output', help='File to write to (defaults to stdout)')
+
+    def handle(self, *args, competition_id, kind, fmt, chunk_size, output, **options):
+        if not Competition.objects.filter(pk=competition_id).exists():
+            raise CommandError(f'Competition {competition_id} does not exist.')
+
+        lines = export_lines(competition_id, kind, fmt, chunk_size)
+        if output:
+            with open(output, 'w', encoding='utf-8', newline='') as handle:
+                handle.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
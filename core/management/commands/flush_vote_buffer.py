@@ -0,0 +1,52 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.vote_buffer import flush, get_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves votes queued by VOTE_INGEST_MODE=buffered into the database in batches. '
+        'Runs until stopped, or until the queue is empty with --once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=float, default=0.5, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, batch_size, interval, once, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        buffer = get_buffer()
+        self.stdout.write(f'Flushing {buffer.path} ({len(buffer)} queued)')
+
+        totals = {'created': 0, 'duplicate': 0, 'missing': 0}
+        while not self.stopping:
+            close_old_connections()
+            started = time.monotonic()
+            counts = flush(buffer, batch_size)
+            if counts:
+                for key in totals:
+                    totals[key] += counts[key]
+                self.stdout.write(
+                    f"{counts['created']} created, {counts['duplicate']} duplicates, "
+                    f"{counts['missing']} missing competition or user in {time.monotonic() - started:.2f}s"
+                )
+            if sum(counts.values()) < batch_size:
+                if once:
+                    break
+                time.sleep(interval)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Flushed {totals['created']} votes ({totals['duplicate']} duplicates and "
+            f"{totals['missing']} with a deleted competition or user dropped); "
+            f"{len(buffer)} still queued."
+        ))
+
+    def stop(self, signum, frame):
+        # Finish the current batch, then exit.
+        self.stopping = True
@@ -0,0 +1,215 @@
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Company, CustomUser, UserRole
+from core.versions import bump_directory_version
+
+# Columns written by the COPY path, in order.
+COPY_COLUMNS = (
+    'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+    'is_staff', 'is_active', 'date_joined', 'role', 'company_id',
+)
+TEXT_COLUMNS = ('password', 'username', 'first_name', 'last_name', 'email', 'role')
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports users from a CSV (username,email,first_name,last_name,company,role,password). '
+        'Existing usernames are skipped, so the import can be re-run safely.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--company', help='Company for rows without a company column')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes used to hash passwords (0 hashes in this process)',
+        )
+        parser.add_argument(
+            '--unusable-passwords', action='store_true',
+            help='Ignore the password column and create users who cannot log in with a password',
+        )
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create even on PostgreSQL')
+
+    def handle(self, *args, csv_path, company, batch_size, workers, unusable_passwords, no_copy, **options):
+        self.default_company = company
+        self.unusable_passwords = unusable_passwords
+        self.workers = workers
+        self.use_copy = connection.vendor == 'postgresql' and not no_copy
+        self.companies = {}
+        self.seen = set()
+        self.counts = {'imported': 0, 'skipped': 0, 'invalid': 0}
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker) if workers > 0 else None
+
+        started = time.monotonic()
+        try:
+            with open(csv_path, newline='', encoding='utf-8') as handle:
+                reader = csv.DictReader(handle)
+                if not reader.fieldnames or 'username' not in reader.fieldnames:
+                    raise CommandError('The CSV needs a header row with at least a username column.')
+                rows = enumerate(reader, start=2)
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    self.import_batch(batch, executor)
+                    self.stdout.write(
+                        f"{self.counts['imported']} imported, {self.counts['skipped']} skipped "
+                        f"({self.rate(started):.0f} rows/s)"
+                    )
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {csv_path}')
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.counts['imported']} users in {time.monotonic() - started:.2f}s "
+            f"({self.rate(started):.0f} rows/s); "
+            f"{self.counts['skipped']} skipped, {self.counts['invalid']} invalid. "
+            f"Insert path: {'COPY' if self.use_copy else 'bulk_create'}."
+        ))
+
+    def rate(self, started):
+        elapsed = time.monotonic() - started
+        return self.counts['imported'] / elapsed if elapsed else 0.0
+
+    def import_batch(self, batch, executor):
+        rows = []
+        for line, row in batch:
+            row = {key: (value or '').strip() for key, value in row.items() if key}
+            error = self.row_error(row)
+            if error:
+                self.counts['invalid'] += 1
+                self.stderr.write(f'Line {line}: {error}')
+            elif row['username'] in self.seen:
+                self.counts['skipped'] += 1
+            else:
+                self.seen.add(row['username'])
+                rows.append(row)
+
+        existing = set(
+            CustomUser.objects.filter(username__in=[r['username'] for r in rows]).values_list('username', flat=True)
+        )
+        rows = [r for r in rows if r['username'] not in existing]
+        self.counts['skipped'] += len(existing)
+        if not rows:
+            return
+
+        self.resolve_companies({r.get('company') or self.default_company for r in rows} - {None, ''})
+        users = self.build_users(rows, executor)
+        with transaction.atomic():
+            inserted = self.copy_users(users) if self.use_copy else self.bulk_create_users(users)
+            # Bulk inserts send no signals, so the directories' ETags are bumped here.
+            if inserted:
+                bump_directory_version(user.company_id for user in users)
+        self.counts['imported'] += inserted
+        self.counts['skipped'] += len(users) - inserted
+
+    def row_error(self, row):
+        username = row.get('username', '')
+        if not username:
+            return 'username is required.'
+        if len(username) > CustomUser._meta.get_field('username').max_length:
+            return 'username is too long.'
+        if row.get('role') and row['role'] not in UserRole.values:
+            return f"unknown role {row['role']!r}."
+        return None
+
+    def resolve_companies(self, names):
+        missing = names - self.companies.keys()
+        if not missing:
+            return
+        Company.objects.bulk_create([Company(name=name) for name in missing], ignore_conflicts=True)
+        self.companies.update(Company.objects.filter(name__in=missing).values_list('name', 'pk'))
+
+    def hash_passwords(self, rows, executor):
+        if self.unusable_passwords:
+            return [make_password(None) for _ in rows]
+        hashes = [None if row.get('password') else make_password(None) for row in rows]
+        to_hash = [(i, row['password']) for i, row in enumerate(rows) if row.get('password')]
+        if executor and to_hash:
+            chunksize = max(1, len(to_hash) // (self.workers * 4))
+            hashed = executor.map(make_password, [p for _, p in to_hash], chunksize=chunksize)
+        else:
+            hashed = map(make_password, [p for _, p in to_hash])
+        for (i, _), password in zip(to_hash, hashed):
+            hashes[i] = password
+        return hashes
+
+    def build_users(self, rows, executor):
+        now = timezone.now()
+        return [
+            CustomUser(
+                username=row['username'],
+                email=row.get('email', ''),
+                first_name=row.get('first_name', ''),
+                last_name=row.get('last_name', ''),
+                role=row.get('role') or UserRole.COMMON_USER,
+                company_id=self.companies.get(row.get('company') or self.default_company),
+                password=password,
+                date_joined=now,
+            )
+            for row, password in zip(rows, self.hash_passwords(rows, executor))
+        ]
+
+    def bulk_create_users(self, users):
+        before = CustomUser.objects.filter(username__in=[u.username for u in users]).count()
+        CustomUser.objects.bulk_create(users, ignore_conflicts=True)
+        after = CustomUser.objects.filter(username__in=[u.username for u in users]).count()
+        return after - before
+
+    def copy_users(self, users):
+        """
+        Loads the batch with COPY into a temporary table and moves it over
+        with INSERT ... ON CONFLICT, so usernames created concurrently are
+        skipped instead of failing the batch.
+        """
+        table = connection.ops.quote_name(CustomUser._meta.db_table)
+        columns = ', '.join(COPY_COLUMNS)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for user in users:
+            writer.writerow([
+                user.password, 'f', user.username, user.first_name, user.last_name, user.email,
+                'f', 't', user.date_joined.isoformat(), user.role,
+                '' if user.company_id is None else user.company_id,
+            ])
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE import_users ON COMMIT DROP AS '
+                f'SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            # Unquoted empty fields are NULL in CSV mode; only company_id may be NULL.
+            copy_sql = (
+                f"COPY import_users ({columns}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(TEXT_COLUMNS)}))"
+            )
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy_expert'):  # psycopg2
+                raw_cursor.copy_expert(copy_sql, buffer)
+            else:  # psycopg 3
+                with raw_cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM import_users '
+                f'ON CONFLICT (username) DO NOTHING'
+            )
+            return cursor.rowcount
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from core.checks import connection_pooling_missing, static_manifest_missing
+from core.management.commands.wait_for_db import wait_for_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Prepares a container in a single process: waits for the database, applies '
+        'pending migrations, ensures a superuser and checks connection pooling and the static files manifest.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--db-timeout', type=float, default=60)
+        parser.add_argument('--skip-migrate', action='store_true')
+        parser.add_argument('--skip-superuser', action='store_true')
+        parser.add_argument('--skip-static', action='store_true')
+        parser.add_argument(
+            '--allow-no-pooler', action='store_true',
+            help='Only warn when ASGI runs against PostgreSQL without PgBouncer',
+        )
+        parser.add_argument(
+            '--collectstatic', action='store_true',
+            help='Collect static files when the manifest is missing instead of failing (local development)',
+        )
+
+    def handle(self, *args, **options):
+        self.timings = []
+        connection = connections[DEFAULT_DB_ALIAS]
+
+        self.step('wait_for_db', lambda: self.wait_for_db(connection, options['db_timeout']))
+        self.step('pooling', lambda: self.pooling(connection, options['allow_no_pooler']))
+        if not options['skip_migrate']:
+            self.step('migrate', lambda: self.migrate(connection))
+        if not options['skip_superuser']:
+            self.step('superuser', lambda: call_command('create_superuser_if_not_exists', stdout=self.stdout))
+        if not options['skip_static']:
+            self.step('static', lambda: self.static(options['collectstatic']))
+
+        total = sum(seconds for _, seconds, _ in self.timings)
+        self.stdout.write(self.style.SUCCESS(f'Preflight finished in {total:.2f}s'))
+        for name, seconds, note in self.timings:
+            self.stdout.write(f'  {name:<14} {seconds:>7.3f}s  {note}')
+
+    def step(self, name, run):
+        started = time.monotonic()
+        note = run() or 'done'
+        self.timings.append((name, time.monotonic() - started, note))
+
+    def wait_for_db(self, connection, timeout):
+        waited = wait_for_database(connection, timeout=timeout, log=self.stdout.write)
+        return f'ready after {waited:.2f}s'
+
+    def pooling(self, connection, allow_missing):
+        if not connection_pooling_missing(connection):
+            return 'ok'
+        message = (
+            'ASGI without PgBouncer opens a PostgreSQL connection per request; '
+            'set DB_POOLER=pgbouncer or let entrypoint.sh start the bundled pooler.'
+        )
+        if not allow_missing:
+            raise CommandError(message)
+        self.stderr.write(self.style.WARNING(message))
+        return 'WARNING: no connection pooler'
+
+    def migrate(self, connection):
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            return 'skipped (no unapplied migrations)'
+        call_command('migrate', interactive=False, verbosity=0)
+        return f'applied {len(plan)} migrations'
+
+    def static(self, collect):
+        # Static files are collected at image build time; rebuilding them on
+        # every container start is exactly what this step guards against.
+        if not static_manifest_missing():
+            return 'manifest present'
+        if not collect:
+            raise CommandError(
+                'Static files manifest is missing; run collectstatic when building the image.'
+            )
+        call_command('collectstatic', interactive=False, verbosity=0)
+        return 'collected (manifest was missing)'
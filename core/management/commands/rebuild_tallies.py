@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tallies import diff_tallies, rebuild_tallies
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds VoteTally from the Vote table, or checks it with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--competition', type=int, action='append', dest='competitions',
+            help='Limit to this competition id (can be repeated)',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare VoteTally with Vote and fail on mismatches',
+        )
+
+    def handle(self, *args, **options):
+        competition_ids = options['competitions']
+
+        if options['check']:
+            mismatches = diff_tallies(competition_ids)
+            for (competition_id, title, nominee_id), (expected, stored) in sorted(mismatches.items()):
+                self.stdout.write(
+                    f'competition={competition_id} title={title!r} nominee={nominee_id}: '
+                    f'expected {expected}, stored {stored}'
+                )
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} tally rows out of sync.')
+            self.stdout.write(self.style.SUCCESS('Tallies are in sync.'))
+            return
+
+        written = rebuild_tallies(competition_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} tally rows.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.snapshots import take_snapshot, unsnapshotted_competitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Stores the final results of competitions whose end date has passed. '
+        'Meant to run daily from cron or a scheduler; competitions that already '
+        'have a snapshot are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--competition', type=int, action='append', dest='competitions',
+            help='Limit to this competition id (can be repeated)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='List the competitions that would be snapshotted')
+
+    def handle(self, *args, competitions, dry_run, **options):
+        queryset = unsnapshotted_competitions()
+        if competitions:
+            queryset = queryset.filter(pk__in=competitions)
+
+        taken = 0
+        for competition in queryset.only('pk', 'name', 'end_date'):
+            if dry_run:
+                self.stdout.write(f'Would snapshot {competition.name} (#{competition.pk}, ended {competition.end_date})')
+                continue
+            snapshot = take_snapshot(competition.pk)
+            taken += 1
+            self.stdout.write(f'Snapshotted {competition.name} (#{competition.pk}): {snapshot.total_votes} votes')
+
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS(f'Took {taken} result snapshots.'))
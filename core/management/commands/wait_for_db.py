@@ -1,22 +1,39 @@
 import time
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
 
+
+def wait_for_database(connection, timeout=60, initial_delay=0.1, max_delay=5, log=None, sleep=time.sleep):
+    """
+    Retries opening a cursor with exponential backoff until the database
+    answers. Returns the seconds waited; raises CommandError after `timeout`.
+    """
+    started = time.monotonic()
+    delay = initial_delay
+    while True:
+        try:
+            connection.ensure_connection()
+            return time.monotonic() - started
+        except OperationalError:
+            elapsed = time.monotonic() - started
+            if elapsed + delay > timeout:
+                raise CommandError(f'Database unavailable after {elapsed:.1f}s.')
+            if log:
+                log(f'Database unavailable, retrying in {delay:.1f}s...')
+            sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+
 class Command(BaseCommand):
     help = 'Wait for database to be ready'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait before giving up')
+
     def handle(self, *args, **options):
         self.stdout.write('Waiting for database...')
-        
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections['default']
-                db_conn.cursor()
-                self.stdout.write(
-                    self.style.SUCCESS('Database is ready!')
-                )
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1) 
\ No newline at end of file
+        wait_for_database(connections['default'], timeout=options['timeout'], log=self.stdout.write)
+        self.stdout.write(
+            self.style.SUCCESS('Database is ready!')
+        )
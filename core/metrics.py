@@ -0,0 +1,97 @@
+"""
+In-process request metrics rendered in the Prometheus text format. Each
+worker process keeps its own registry; scrape every instance (or let the
+collector sum them) for totals.
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{_labels(labels)} {self.count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.db_durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.counters = defaultdict(int)
+
+    def observe_request(self, view, method, status, seconds, queries=None):
+        labels = (('view', view), ('method', method))
+        with self.lock:
+            self.durations[labels].observe(seconds)
+            self.counters[('http_requests_total', labels + (('status', status),))] += 1
+            if queries is not None:
+                self.db_durations[labels].observe(queries.seconds)
+                self.query_counts[labels].observe(queries.count)
+                if queries.slow:
+                    self.counters[('db_slow_queries_total', labels)] += len(queries.slow)
+                if queries.duplicates:
+                    self.counters[('db_duplicate_query_requests_total', labels)] += 1
+
+    def increment(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[(name, tuple(labels))] += value
+
+    def render(self, extra_counters=()):
+        with self.lock:
+            sections = [
+                ('http_request_duration_seconds', 'histogram', 'Request wall time.', self.durations),
+                ('db_query_duration_seconds', 'histogram', 'DB time per sampled request.', self.db_durations),
+                ('db_queries_per_request', 'histogram', 'DB queries per sampled request.', self.query_counts),
+            ]
+            lines = []
+            for name, kind, help_text, series in sections:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for labels, histogram in sorted(series.items()):
+                    lines += histogram.render(name, labels)
+            counters = defaultdict(list)
+            for (name, labels), value in list(self.counters.items()) + list(extra_counters):
+                counters[name].append((labels, value))
+        for name, samples in sorted(counters.items()):
+            lines.append(f'# TYPE {name} counter')
+            lines += [f'{name}{_labels(labels)} {value}' for labels, value in sorted(samples)]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,191 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+from core.routers import REPLICA_STICKY_SECONDS, end_request, replica_alias, start_request
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+logger = logging.getLogger('core.performance')
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins requests to the primary database while they write, and for
+    REPLICA_STICKY_SECONDS afterwards via a cookie, so clients read their own
+    writes. Does nothing when no replica is configured.
+    """
+    cookie_name = 'db_primary_until'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if replica_alias() is None:
+            return self.get_response(request)
+        token, state = start_request(self.must_pin(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.process_response(response, state)
+
+    async def __acall__(self, request):
+        if replica_alias() is None:
+            return await self.get_response(request)
+        token, state = start_request(self.must_pin(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.process_response(response, state)
+
+    def must_pin(self, request):
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            return float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_response(self, response, state):
+        if state['wrote']:
+            response.set_cookie(
+                self.cookie_name, str(time.time() + REPLICA_STICKY_SECONDS),
+                max_age=REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that counts queries and their time, remembering slow
+    statements and statements repeated often enough to suggest an N+1.
+    """
+
+    def __init__(self, slow_seconds):
+        self.slow_seconds = slow_seconds
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = []
+        self.statements = Counter()
+        self.duplicates = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.statements[sql] += 1
+            if elapsed >= self.slow_seconds:
+                self.slow.append((sql, elapsed))
+
+    def finish(self, duplicate_threshold):
+        self.duplicates = {sql: n for sql, n in self.statements.items() if n >= duplicate_threshold}
+
+
+class PerformanceMiddleware:
+    """
+    Records wall time per view into core.metrics. A PERF_SAMPLE_RATE share of
+    requests is also instrumented at the database level: those get a
+    Server-Timing header and a JSON log line on the core.performance logger,
+    logged as a warning when the request or one of its queries is slow, or
+    when a statement repeats PERF_DUPLICATE_QUERY_THRESHOLD times or more.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.PERF_INSTRUMENTATION:
+            return self.get_response(request)
+        started = time.perf_counter()
+        if not self.sampled():
+            response = self.get_response(request)
+            self.record(request, response, started)
+            return response
+        recorder = QueryRecorder(settings.PERF_SLOW_QUERY_MS / 1000)
+        with self.instrument(recorder):
+            response = self.get_response(request)
+        return self.record(request, response, started, recorder)
+
+    async def __acall__(self, request):
+        if not settings.PERF_INSTRUMENTATION:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        if not self.sampled():
+            response = await self.get_response(request)
+            self.record(request, response, started)
+            return response
+        recorder = QueryRecorder(settings.PERF_SLOW_QUERY_MS / 1000)
+        with self.instrument(recorder):
+            response = await self.get_response(request)
+        return self.record(request, response, started, recorder)
+
+    def sampled(self):
+        rate = settings.PERF_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def instrument(self, recorder):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        return stack
+
+    def record(self, request, response, started, recorder=None):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        if recorder is not None:
+            recorder.finish(settings.PERF_DUPLICATE_QUERY_THRESHOLD)
+        metrics.registry.observe_request(view, request.method, response.status_code, elapsed, recorder)
+        if recorder is None:
+            return response
+
+        response['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries"'
+        )
+        slow_request = elapsed * 1000 >= settings.PERF_SLOW_REQUEST_MS
+        flagged = slow_request or recorder.slow or recorder.duplicates
+        logger.log(logging.WARNING if flagged else logging.INFO, json.dumps({
+            'event': 'request',
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+            'db_queries': recorder.count,
+            'db_ms': round(recorder.seconds * 1000, 1),
+            'slow_request': slow_request,
+            'slow_queries': [
+                {'sql': sql[:500], 'ms': round(seconds * 1000, 1)} for sql, seconds in recorder.slow
+            ],
+            'duplicate_queries': [
+                {'sql': sql[:500], 'count': count} for sql, count in recorder.duplicates.items()
+            ],
+        }))
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, verbose_name='Vote Title')),
+                ('votes', models.PositiveIntegerField(default=0, verbose_name='Votes')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='core.competition', verbose_name='Related Competition')),
+                ('nominee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to=settings.AUTH_USER_MODEL, verbose_name='Nominado')),
+            ],
+            options={
+                'verbose_name': 'Vote Tally',
+                'verbose_name_plural': 'Vote Tallies',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='votetally',
+            constraint=models.UniqueConstraint(fields=('competition', 'title', 'nominee'), name='unique_tally_per_nominee'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+# How many duplicate groups the error message lists.
+REPORTED_DUPLICATES = 20
+
+
+def check_duplicate_votes(apps, schema_editor):
+    """
+    Refuses to add unique_vote_per_voter_and_title while votes break it, and
+    names the offending groups instead of failing on an opaque IntegrityError.
+    Which duplicate to keep is left to an operator: deleting votes here would
+    also leave the tallies out of step.
+    """
+    Vote = apps.get_model('core', 'Vote')
+    duplicates = list(
+        Vote.objects.filter(voter__isnull=False)
+        .values('competition_id', 'voter_id', 'title')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('competition_id', 'voter_id', 'title')[:REPORTED_DUPLICATES + 1]
+    )
+    if not duplicates:
+        return
+    lines = [
+        f"competition={row['competition_id']} voter={row['voter_id']} title={row['title']!r}: {row['count']} votes"
+        for row in duplicates[:REPORTED_DUPLICATES]
+    ]
+    if len(duplicates) > REPORTED_DUPLICATES:
+        lines.append('...')
+    raise RuntimeError(
+        'Cannot add unique_vote_per_voter_and_title: some voters voted more than once '
+        'for the same title. Delete all but one vote in each group (then run rebuild_tallies) '
+        'before migrating:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_vote_tally'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['competition', 'nominee', 'title'], name='vote_comp_nominee_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(condition=models.Q(('is_public', False)), fields=['-id'], name='vote_private_idx'),
+        ),
+        migrations.RunPython(check_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(condition=models.Q(('voter__isnull', False)), fields=('competition', 'voter', 'title'), name='unique_vote_per_voter_and_title'),
+        ),
+        # Dropped last so competition lookups are never left without an index.
+        migrations.AlterField(
+            model_name='vote',
+            name='competition',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.competition', verbose_name='Related Competition'),
+        ),
+    ]
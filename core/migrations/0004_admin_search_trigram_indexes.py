@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Admin search uses icontains, which PostgreSQL runs as
+# UPPER(col::text) LIKE UPPER('%term%'); trigram GIN indexes on that same
+# expression let it use an index instead of scanning. PostgreSQL only, so
+# they are created here rather than in Meta.indexes.
+TRIGRAM_INDEXES = (
+    ('core_vote_title_trgm', 'core_vote', 'title'),
+    ('core_competition_name_trgm', 'core_competition', 'name'),
+    ('core_company_name_trgm', 'core_company', 'name'),
+    ('core_customuser_username_trgm', 'core_customuser', 'username'),
+    ('core_customuser_first_name_trgm', 'core_customuser', 'first_name'),
+    ('core_customuser_last_name_trgm', 'core_customuser', 'last_name'),
+    ('core_customuser_email_trgm', 'core_customuser', 'email'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_vote_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
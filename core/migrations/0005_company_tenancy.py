@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:38
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_admin_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', core.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='company',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='competitions', to='core.company', verbose_name='Empresa'),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='company',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='votes', to='core.company', verbose_name='Empresa'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def backfill_company(apps, schema_editor):
+    """
+    Copies creator.company onto competitions and competition.company onto
+    votes, in id ranges so each UPDATE (and its transaction) stays small on
+    large vote tables.
+    """
+    Competition = apps.get_model('core', 'Competition')
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Vote = apps.get_model('core', 'Vote')
+
+    Competition.objects.filter(creator__isnull=False).update(
+        company_id=Subquery(CustomUser.objects.filter(pk=OuterRef('creator_id')).values('company_id')[:1])
+    )
+    last = Vote.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for start in range(0, last, BATCH_SIZE):
+        Vote.objects.filter(pk__gt=start, pk__lte=start + BATCH_SIZE).update(
+            company_id=Subquery(Competition.objects.filter(pk=OuterRef('competition_id')).values('company_id')[:1])
+        )
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own instead of holding one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_company_tenancy'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_company, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_backfill_company'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='competition',
+            index=models.Index(fields=['company', 'end_date'], name='competition_company_end_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customuser',
+            index=models.Index(fields=['company', 'id'], name='user_company_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vote',
+            index=models.Index(fields=['company', '-id'], name='vote_company_id_idx'),
+        ),
+        # Dropped last: user_company_id_idx serves company lookups from here on.
+        migrations.AlterField(
+            model_name='customuser',
+            name='company',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='core.company', verbose_name='Empresa'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_company_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='votes_archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Votes Archived At'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedVote',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100, verbose_name='Vote Title')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('award', models.CharField(blank=True, max_length=100, verbose_name='Award')),
+                ('is_public', models.BooleanField(default=True, verbose_name='Is Public?')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+                ('company', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_votes', to='core.company', verbose_name='Empresa')),
+                ('competition', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_votes', to='core.competition', verbose_name='Related Competition')),
+                ('nominee', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_votes_received', to=settings.AUTH_USER_MODEL, verbose_name='Nominado')),
+                ('voter', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_votes_made', to=settings.AUTH_USER_MODEL, verbose_name='Votante')),
+            ],
+            options={
+                'verbose_name': 'Archived Vote',
+                'verbose_name_plural': 'Archived Votes',
+                'indexes': [models.Index(fields=['competition', 'id'], name='archivedvote_comp_id_idx'), models.Index(fields=['company', '-id'], name='archivedvote_company_id_idx')],
+            },
+        ),
+    ]
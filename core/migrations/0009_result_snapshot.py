@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_archived_vote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSnapshot',
+            fields=[
+                ('competition', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_snapshot', serialize=False, to='core.competition', verbose_name='Related Competition')),
+                ('total_votes', models.PositiveIntegerField(verbose_name='Total Votes')),
+                ('rows', models.JSONField(verbose_name='Tally Rows')),
+                ('result', models.JSONField(verbose_name='Result')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Result Snapshot',
+                'verbose_name_plural': 'Result Snapshots',
+            },
+        ),
+    ]
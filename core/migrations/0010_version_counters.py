@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_result_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='directory_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Directory Updated At'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='directory_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Directory Version'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='results_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Results Updated At'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='results_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Results Version'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Prefix searches (istartswith, e.g. the admin's user autocomplete) run on
+# PostgreSQL as UPPER(col::text) LIKE UPPER('term%'). Under a non-C
+# collation a plain btree cannot serve LIKE; varchar_pattern_ops on the same
+# expression can. PostgreSQL only, like the trigram indexes of 0004, which
+# keep serving the icontains searches.
+PREFIX_INDEXES = (
+    ('core_customuser_username_prefix', 'username'),
+    ('core_customuser_first_name_prefix', 'first_name'),
+    ('core_customuser_last_name_prefix', 'last_name'),
+)
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON core_customuser ((UPPER({column}::text)) varchar_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_version_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
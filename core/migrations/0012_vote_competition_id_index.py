@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+from core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_customuser_prefix_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='vote',
+            index=models.Index(fields=['competition', 'id'], name='vote_comp_id_idx'),
+        ),
+    ]
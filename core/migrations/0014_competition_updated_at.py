@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_archivedvote_title_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Updated At'),
+        ),
+    ]
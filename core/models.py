@@ -1,5 +1,37 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser # Importa AbstractUser
+from django.db import models, transaction
+from django.contrib.auth.models import AbstractUser, UserManager # Importa AbstractUser
+
+
+class CompanyQuerySet(models.QuerySet):
+    """Tenant scoping for models with a `company` foreign key."""
+
+    def for_company(self, company):
+        # `company` may be a Company or its id; scoping on the local column
+        # keeps per-company queries on the company-leading indexes, no joins.
+        return self.filter(company_id=getattr(company, 'pk', company))
+
+
+CompanyManager = models.Manager.from_queryset(CompanyQuerySet)
+
+
+class CustomUserManager(UserManager.from_queryset(CompanyQuerySet)):
+    pass
+
+
+def _save_without(instance, fields, kwargs):
+    """
+    Leaves `fields` out of a full save of an existing row. Used for version
+    counters, which are only ever bumped with UPDATE ... = field + 1: saving
+    a stale instance (e.g. from an admin form) must not roll them back.
+    Anything that is not an UPDATE of a loaded row (a new instance, one whose
+    pk delete() cleared, a forced insert) gets a normal save instead.
+    """
+    existing_row = not instance._state.adding and instance.pk is not None and not kwargs.get('force_insert')
+    if existing_row and kwargs.get('update_fields') is None:
+        kwargs['update_fields'] = [
+            f.name for f in instance._meta.concrete_fields if not f.primary_key and f.name not in fields
+        ]
+    return kwargs
 
 class UserRole(models.TextChoices):
     ADMIN = 'ADMIN', 'Administrador'
@@ -9,6 +41,12 @@ class UserRole(models.TextChoices):
 class Company(models.Model):
     name = models.CharField(max_length=255, unique=True, verbose_name="Nombre de la Empresa")
     # Puedes añadir más campos aquí si lo necesitas, como dirección, etc.
+    # Bumped by core.versions whenever a user of the company changes; the
+    # ETag / Last-Modified of the company's user directory.
+    directory_version = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Directory Version")
+    directory_updated_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name="Directory Updated At"
+    )
 
     class Meta:
         verbose_name = "Empresa"
@@ -17,6 +55,9 @@ class Company(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **_save_without(self, ('directory_version', 'directory_updated_at'), kwargs))
+
 class CustomUser(AbstractUser):
     role = models.CharField(
         max_length=20,
@@ -29,13 +70,20 @@ class CustomUser(AbstractUser):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
+        db_index=False,
         related_name='users',
         verbose_name="Empresa"
     )
 
+    objects = CustomUserManager()
+
     class Meta:
         verbose_name = "Usuario Personalizado"
         verbose_name_plural = "Usuarios Personalizados"
+        indexes = [
+            # Company directory pages, keyset-paginated by id.
+            models.Index(fields=['company', 'id'], name='user_company_id_idx'),
+        ]
 
     def __str__(self):
         return self.username
@@ -57,20 +105,77 @@ class Competition(models.Model):
         related_name='competitions_created',
         verbose_name="Creador"
     )
+    # Denormalized from creator.company when the competition is saved, so
+    # per-company queries need no join. A competition stays with the company
+    # it was created for if its creator later moves.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='competitions',
+        verbose_name="Empresa"
+    )
+    # Set by `manage.py archive_votes` once every vote was moved to ArchivedVote.
+    votes_archived_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Votes Archived At")
+    # Bumped by core.versions on every tally change; the ETag / Last-Modified
+    # of the competition's results and the version of live result events.
+    results_version = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Results Version")
+    results_updated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Results Updated At")
+    # Set on every save. With the number of open competitions it is the ETag /
+    # Last-Modified of the competition list (see core.services).
+    updated_at = models.DateTimeField(auto_now=True, null=True, verbose_name="Updated At")
 
+    objects = CompanyManager()
 
     def __str__(self):
         return self.name
 
+    def _creator_company_id(self):
+        creator = self._state.fields_cache.get('creator')
+        if creator is not None and creator.pk == self.creator_id:
+            return creator.company_id
+        return CustomUser.objects.filter(pk=self.creator_id).values_list('company_id', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using):
+            stored = None
+            if not self._state.adding and self.pk is not None:
+                stored = Competition.objects.using(using).filter(pk=self.pk).values_list(
+                    'creator_id', 'company_id'
+                ).first()
+            # The company follows the creator when the competition is created
+            # or handed to someone else, unless it was set explicitly; later
+            # moves of the creator leave it where it is.
+            if stored is None:
+                derive = self.company_id is None
+            else:
+                derive = self.creator_id != stored[0] and self.company_id == stored[1]
+            if derive and self.creator_id is not None:
+                self.company_id = self._creator_company_id()
+            moved = stored is not None and stored[1] != self.company_id
+            super().save(*args, **_save_without(self, ('results_version', 'results_updated_at'), kwargs))
+            if moved:
+                Vote.objects.using(using).filter(competition_id=self.pk).update(company_id=self.company_id)
+                ArchivedVote.objects.using(using).filter(competition_id=self.pk).update(company_id=self.company_id)
+
     class Meta:
         verbose_name = "Competition"
         verbose_name_plural = "Competitions"
+        indexes = [
+            # Per-company listings, e.g. a company's open competitions by date.
+            models.Index(fields=['company', 'end_date'], name='competition_company_end_idx'),
+        ]
 
 
 class Vote(models.Model):
+    # Not indexed on its own: the competition-leading indexes in Meta cover it.
     competition = models.ForeignKey(
         Competition,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name="Related Competition"
     )
     title = models.CharField(
@@ -110,11 +215,179 @@ class Vote(models.Model):
         verbose_name="Nominado",
         null=True
     )
+    # Copied from competition.company on save (bulk paths set it themselves).
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='votes',
+        verbose_name="Empresa"
+    )
+
+    objects = CompanyManager()
 
 
     def __str__(self):
         return f"{self.title} ({self.competition.name})"
 
+    def save(self, *args, **kwargs):
+        competition = self._state.fields_cache.get('competition')
+        if competition is not None and competition.pk == self.competition_id:
+            self.company_id = competition.company_id
+        elif self.competition_id is not None:
+            self.company_id = Competition.objects.filter(pk=self.competition_id).values_list(
+                'company_id', flat=True
+            ).first()
+        # Keeps the vote and its VoteTally update (see core.signals) in one transaction.
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Vote"
         verbose_name_plural = "Votes"
+        constraints = [
+            # Also serves "has this user already voted" lookups by (competition, voter).
+            models.UniqueConstraint(
+                fields=['competition', 'voter', 'title'],
+                condition=models.Q(voter__isnull=False),
+                name='unique_vote_per_voter_and_title',
+            ),
+        ]
+        indexes = [
+            # Tallying: votes grouped by (title, nominee) within a competition.
+            models.Index(fields=['competition', 'nominee', 'title'], name='vote_comp_nominee_title_idx'),
+            # Keyset pages of a competition's votes (core.pagination) read them in id order.
+            models.Index(fields=['competition', 'id'], name='vote_comp_id_idx'),
+            # Admin filter on is_public: private votes are the minority, public ones a full scan anyway.
+            models.Index(fields=['-id'], condition=models.Q(is_public=False), name='vote_private_idx'),
+            # Per-company vote listings and exports, newest first.
+            models.Index(fields=['company', '-id'], name='vote_company_id_idx'),
+        ]
+
+
+class VoteTally(models.Model):
+    """
+    Denormalized vote count per (competition, title, nominee), kept in sync
+    with Vote by core.signals so results can be read without scanning votes.
+    """
+    competition = models.ForeignKey(
+        Competition,
+        on_delete=models.CASCADE,
+        related_name='tallies',
+        verbose_name="Related Competition"
+    )
+    title = models.CharField(max_length=100, verbose_name="Vote Title")
+    nominee = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='tallies',
+        verbose_name="Nominado"
+    )
+    votes = models.PositiveIntegerField(default=0, verbose_name="Votes")
+
+    def __str__(self):
+        return f"{self.title}: {self.nominee_id} ({self.votes})"
+
+    class Meta:
+        verbose_name = "Vote Tally"
+        verbose_name_plural = "Vote Tallies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['competition', 'title', 'nominee'],
+                name='unique_tally_per_nominee',
+            ),
+        ]
+
+
+class ArchivedVote(models.Model):
+    """
+    Votes of closed competitions, moved out of Vote by `manage.py
+    archive_votes` so the live table and its indexes only hold votes that
+    can still change. Rows keep their original id; tallies were frozen in
+    VoteTally before the move.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    competition = models.ForeignKey(
+        Competition,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='archived_votes',
+        verbose_name="Related Competition"
+    )
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='archived_votes',
+        verbose_name="Empresa"
+    )
+    title = models.CharField(max_length=100, verbose_name="Vote Title")
+    description = models.TextField(blank=True, verbose_name="Description")
+    award = models.CharField(max_length=100, blank=True, verbose_name="Award")
+    is_public = models.BooleanField(default=True, verbose_name="Is Public?")
+    voter = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='archived_votes_made',
+        verbose_name="Votante"
+    )
+    nominee = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='archived_votes_received',
+        verbose_name="Nominado"
+    )
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archived At")
+
+    objects = CompanyManager()
+
+    def __str__(self):
+        return f"{self.title} ({self.competition_id})"
+
+    class Meta:
+        verbose_name = "Archived Vote"
+        verbose_name_plural = "Archived Votes"
+        indexes = [
+            # Exports and listings read a competition's votes in id order.
+            models.Index(fields=['competition', 'id'], name='archivedvote_comp_id_idx'),
+            models.Index(fields=['company', '-id'], name='archivedvote_company_id_idx'),
+        ]
+
+
+class ResultSnapshot(models.Model):
+    """
+    Final results of a closed competition, written once by `manage.py
+    snapshot_results`. `rows` holds the compact (title, nominee_id,
+    username, votes) tally that get_winner rebuilds results from; `result`
+    is the same data in the JSON shape the results endpoints return.
+    """
+    competition = models.OneToOneField(
+        Competition,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='result_snapshot',
+        verbose_name="Related Competition"
+    )
+    total_votes = models.PositiveIntegerField(verbose_name="Total Votes")
+    rows = models.JSONField(verbose_name="Tally Rows")
+    result = models.JSONField(verbose_name="Result")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    def __str__(self):
+        return f"Results of {self.competition_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Result snapshots are immutable; delete and retake them instead.")
+        kwargs['force_insert'] = True
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = "Result Snapshot"
+        verbose_name_plural = "Result Snapshots"
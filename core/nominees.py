@@ -0,0 +1,145 @@
+"""
+Per-company nominee autocomplete.
+
+Each company's active users are kept in process as a sorted array of
+(search key, user id) pairs. The keys are the username and every word
+suffix of the full name ("maria jose gomez", "jose gomez", "gomez"),
+folded to lowercase without accents. The matches for a prefix form one
+contiguous run of that array, found with a bisect, so a lookup costs
+O(log n + k) however large the company is.
+
+Indexes are tagged with the company's directory_version (see
+core.versions) and rebuilt on the first lookup after any change to its
+users. One thread per company builds; meanwhile the other lookups for that
+company keep getting the previous index, and lookups for other companies
+are not held up. At most NOMINEE_INDEX_MAX_COMPANIES indexes are kept per
+process, least recently used first out.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.models import Company, CustomUser
+
+MAX_COMPANIES = getattr(settings, 'NOMINEE_INDEX_MAX_COMPANIES', 32)
+DEFAULT_LIMIT = 10
+
+_indexes = OrderedDict()  # company_id -> NomineeIndex
+_lock = threading.Lock()
+# company_id -> lock held while building that company's index, so
+# concurrent misses build it once.
+_build_locks = {}
+
+
+def fold(text):
+    """Lowercase, accent-free form used for both keys and queries ("José" -> "jose")."""
+    if text.isascii():
+        return text.lower().strip()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class NomineeIndex:
+    def __init__(self, users, version=None):
+        """
+        `users` yields (id, username, first_name, last_name) rows of the
+        company's directory at `version`.
+        """
+        self.version = version
+        self.users = {}
+        entries = []
+        for user_id, username, first_name, last_name in users:
+            self.users[user_id] = (username, first_name, last_name)
+            words = fold(f'{first_name} {last_name}').split()
+            keys = {fold(username)} | {' '.join(words[i:]) for i in range(len(words))}
+            entries.extend((key, user_id) for key in keys if key)
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [user_id for _, user_id in entries]
+
+    def __len__(self):
+        return len(self.users)
+
+    def search(self, query, limit=DEFAULT_LIMIT, exclude=()):
+        """
+        Up to `limit` users with a key starting with `query`, in key order
+        (so shorter and alphabetically earlier matches come first).
+        """
+        prefix = fold(query)
+        if not prefix or limit < 1:
+            return []
+        found = []
+        seen = set(exclude)
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            user_id = self.ids[position]
+            position += 1
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            username, first_name, last_name = self.users[user_id]
+            found.append({'id': user_id, 'username': username, 'first_name': first_name, 'last_name': last_name})
+            if len(found) == limit:
+                break
+        return found
+
+
+def _nominee_rows(company_id):
+    return (
+        CustomUser.objects.for_company(company_id)
+        .filter(is_active=True)
+        .values_list('id', 'username', 'first_name', 'last_name')
+        .iterator(chunk_size=10000)
+    )
+
+
+def _cached(company_id):
+    """The company's index (any version) and the lock for building it."""
+    with _lock:
+        index = _indexes.get(company_id)
+        if index is not None:
+            _indexes.move_to_end(company_id)
+        return index, _build_locks.setdefault(company_id, threading.Lock())
+
+
+def get_index(company_id, version=None):
+    """
+    The company's NomineeIndex for `version` of its directory (read from the
+    database when not given), building it on a miss. While another thread
+    rebuilds it, the previous version is returned instead: check
+    `index.version`.
+    """
+    if version is None:
+        version = Company.objects.filter(pk=company_id).values_list('directory_version', flat=True).first()
+    index, build_lock = _cached(company_id)
+    if index is not None and index.version == version:
+        return index
+    if not build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        index, _ = _cached(company_id)
+        if index is not None and index.version == version:
+            return index
+        index = NomineeIndex(_nominee_rows(company_id), version)
+        with _lock:
+            _indexes[company_id] = index
+            _indexes.move_to_end(company_id)
+            while len(_indexes) > MAX_COMPANIES:
+                evicted, _ = _indexes.popitem(last=False)
+                _build_locks.pop(evicted, None)
+    finally:
+        build_lock.release()
+    return index
+
+
+def search_nominees(company_id, query, limit=DEFAULT_LIMIT, exclude=(), version=None):
+    return get_index(company_id, version).search(query, limit, exclude)
+
+
+def clear_indexes():
+    with _lock:
+        _indexes.clear()
+        _build_locks.clear()
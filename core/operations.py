@@ -0,0 +1,26 @@
+"""
+Migration operations shared by the core migrations.
+"""
+from django.contrib.postgres import operations as postgres_operations
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY on PostgreSQL, so building the index does not
+    block writes to a live table; a plain AddIndex on other backends (the
+    SQLite benchmark databases). Needs atomic = False on the migration.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super(postgres_operations.AddIndexConcurrently, self).database_forwards(
+                app_label, schema_editor, from_state, to_state,
+            )
+        return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super(postgres_operations.AddIndexConcurrently, self).database_backwards(
+                app_label, schema_editor, from_state, to_state,
+            )
+        return super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,82 @@
+"""
+Primary/replica database routing.
+
+Reads go to the replica alias (DATABASE_REPLICA_ALIAS, 'replica' by default)
+when it is configured, except when they must see the primary:
+
+- inside a transaction on the primary,
+- inside ``use_primary()``,
+- during unsafe (write) requests,
+- for a short window (REPLICA_STICKY_SECONDS) after a client wrote, so it
+  reads its own writes. ReplicaStickinessMiddleware tracks that with a cookie.
+
+Writes always go to the primary. Without a replica every query uses
+'default', as if no router were installed.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+# Per-request state: a mutable dict so writes made in sync_to_async threads
+# are visible to the middleware that created it.
+_request_state = ContextVar('replica_request_state', default=None)
+_force_primary = ContextVar('replica_force_primary', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in connections.settings else None
+
+
+@contextmanager
+def use_primary():
+    """Routes every read in the block to the primary."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def start_request(pinned):
+    state = {'pinned': pinned, 'wrote': False}
+    return _request_state.set(state), state
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = replica_alias()
+        if replica is None or _force_primary.get():
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state and (state['pinned'] or state['wrote']):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary; it is never migrated directly.
+        if db == replica_alias():
+            return False
+        return None
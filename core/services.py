@@ -1,4 +1,214 @@
-from core.models import Competition
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from core.cache import COMPETITIONS_SCOPE, aget_or_compute, competition_scope, get_or_compute
+from core.models import Competition, ResultSnapshot, VoteTally
+
+
+@dataclass(frozen=True)
+class NomineeTally:
+    nominee_id: int
+    username: str
+    votes: int
+
+
+@dataclass(frozen=True)
+class CategoryResult:
+    title: str
+    tally: tuple  # NomineeTally, ordered by votes desc then nominee_id asc
+    total_votes: int
+
+    @property
+    def winner(self) -> Optional[NomineeTally]:
+        return self.tally[0] if self.tally else None
+
+    @property
+    def is_tie(self) -> bool:
+        return len(self.tally) > 1 and self.tally[0].votes == self.tally[1].votes
+
+
+@dataclass(frozen=True)
+class CompetitionResult:
+    competition_id: int
+    categories: tuple  # CategoryResult, ordered by title
+    overall: tuple  # NomineeTally summed across categories, same ordering
+    total_votes: int
+
+    @property
+    def winner(self) -> Optional[NomineeTally]:
+        return self.overall[0] if self.overall else None
+
+    @property
+    def is_tie(self) -> bool:
+        return len(self.overall) > 1 and self.overall[0].votes == self.overall[1].votes
+
+
+def _ranked(tallies):
+    # Ties are broken by the lowest nominee id so results never flip between requests.
+    return tuple(sorted(tallies, key=lambda t: (-t.votes, t.nominee_id)))
+
+
+def build_result(competition_id, rows):
+    """
+    Builds a CompetitionResult from (title, nominee_id, username, votes) rows,
+    one per category/nominee pair.
+    """
+    by_title = {}
+    overall = {}
+    for title, nominee_id, username, votes in rows:
+        by_title.setdefault(title, []).append(NomineeTally(nominee_id, username, votes))
+        current = overall.get(nominee_id)
+        overall[nominee_id] = NomineeTally(
+            nominee_id, username, votes + (current.votes if current else 0)
+        )
+
+    categories = tuple(
+        CategoryResult(
+            title=title,
+            tally=_ranked(tallies),
+            total_votes=sum(t.votes for t in tallies),
+        )
+        for title, tallies in sorted(by_title.items())
+    )
+    return CompetitionResult(
+        competition_id=competition_id,
+        categories=categories,
+        overall=_ranked(overall.values()),
+        total_votes=sum(c.total_votes for c in categories),
+    )
+
+
+def result_to_dict(result):
+    def tally(t):
+        return {'nominee': t.nominee_id, 'username': t.username, 'votes': t.votes}
+
+    def winner(w):
+        return tally(w) if w else None
+
+    return {
+        'competition': result.competition_id,
+        'total_votes': result.total_votes,
+        'winner': winner(result.winner),
+        'is_tie': result.is_tie,
+        'overall': [tally(t) for t in result.overall],
+        'categories': [
+            {
+                'title': c.title,
+                'total_votes': c.total_votes,
+                'winner': winner(c.winner),
+                'is_tie': c.is_tie,
+                'tally': [tally(t) for t in c.tally],
+            }
+            for c in result.categories
+        ],
+    }
+
+
+def _tally_rows(competition_id):
+    return (
+        VoteTally.objects
+        .filter(competition_id=competition_id, votes__gt=0)
+        .values_list('title', 'nominee_id', 'nominee__username', 'votes')
+    )
+
+
+def _snapshot_rows(competition_id):
+    return ResultSnapshot.objects.filter(pk=competition_id).values_list('rows', flat=True)
+
 
 def get_winner(competition_id):
-    return "No winners yet"  # Implementación mínima para pasar el test
\ No newline at end of file
+    """
+    Reads a competition's per-category and overall winners. Closed
+    competitions are served from their ResultSnapshot with one primary key
+    lookup; open ones from VoteTally, so the cost grows with nominees rather
+    than votes.
+    """
+    rows = _snapshot_rows(competition_id).first()
+    if rows is None:
+        rows = _tally_rows(competition_id)
+    return build_result(competition_id, rows)
+
+
+async def aget_winner(competition_id):
+    """Async variant of get_winner using the native async ORM."""
+    rows = await _snapshot_rows(competition_id).afirst()
+    if rows is None:
+        # Django 4.2's aiterator() does not support values_list() querysets.
+        rows = [row async for row in _tally_rows(competition_id)]
+    return build_result(competition_id, rows)
+
+
+def _versioned_tally_rows(competition_id):
+    # Competition LEFT JOIN its tallies: one statement, so the version and
+    # the tallies come from the same view of the database.
+    return Competition.objects.filter(pk=competition_id).values_list(
+        'results_version', 'tallies__title', 'tallies__nominee_id', 'tallies__nominee__username', 'tallies__votes',
+    )
+
+
+async def aget_versioned_winner(competition_id):
+    """
+    (results_version, CompetitionResult) read together from VoteTally, for
+    live streams that must tell which published changes a result already
+    includes. The version is None for an unknown competition.
+    """
+    version, rows = None, []
+    async for version, title, nominee_id, username, votes in _versioned_tally_rows(competition_id):
+        if votes:
+            rows.append((title, nominee_id, username, votes))
+    return version, build_result(competition_id, rows)
+
+
+def get_cached_winner(competition_id, results_version=None):
+    """
+    Cached get_winner. Views pass the Competition.results_version their ETag
+    was built from, so a body cached before the version moved (the cache is
+    only invalidated after commit) is never served under the new ETag.
+    """
+    return get_or_compute(
+        competition_scope(competition_id), 'winner', lambda: get_winner(competition_id), variant=results_version
+    )
+
+
+async def aget_cached_winner(competition_id, results_version=None):
+    return await aget_or_compute(
+        competition_scope(competition_id), 'winner', lambda: aget_winner(competition_id), variant=results_version
+    )
+
+
+def active_competitions_state(today=None):
+    """
+    (count, last updated_at) of the competitions open for voting today, read
+    from the database: a competition that is added, edited or removed
+    changes one or the other.
+    """
+    today = today or timezone.localdate()
+    state = Competition.objects.filter(start_date__lte=today, end_date__gte=today).aggregate(
+        count=Count('pk'), updated_at=Max('updated_at'),
+    )
+    return state['count'], state['updated_at']
+
+
+def get_active_competitions(today=None, state=None):
+    """
+    Competitions open for voting today, as plain dicts, cached per day and,
+    given active_competitions_state(), per state of the rows it lists.
+    """
+    today = today or timezone.localdate()
+    variant = today.isoformat()
+    if state is not None:
+        count, updated_at = state
+        variant += f':{count}:{updated_at.timestamp() if updated_at else 0}'
+
+    def compute():
+        return list(
+            Competition.objects
+            .filter(start_date__lte=today, end_date__gte=today)
+            .order_by('end_date', 'pk')
+            .values('id', 'name', 'start_date', 'end_date', 'company_id')
+        )
+
+    return get_or_compute(COMPETITIONS_SCOPE, 'active_competitions', compute, variant=variant)
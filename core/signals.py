@@ -0,0 +1,107 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import invalidate_competition_cache, invalidate_competition_list
+from core.models import Competition, CustomUser, Vote
+from core.tallies import apply_tally_deltas, tally_key
+from core.throttling import add_voted, forget_voted
+from core.versions import bump_directory_version
+
+
+@receiver(pre_save, sender=Vote)
+def remember_previous_tally_key(sender, instance, **kwargs):
+    instance._previous_tally_key = None
+    if instance._state.adding or instance.pk is None:
+        return
+    previous = (
+        Vote.objects.filter(pk=instance.pk)
+        .values_list('competition_id', 'title', 'nominee_id')
+        .first()
+    )
+    if previous and previous[2] is not None:
+        instance._previous_tally_key = previous
+
+
+@receiver(post_save, sender=Vote)
+def update_tally_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = Counter()
+    if not created and getattr(instance, '_previous_tally_key', None):
+        deltas[instance._previous_tally_key] -= 1
+    key = tally_key(instance)
+    if key:
+        deltas[key] += 1
+    apply_tally_deltas(deltas)
+
+
+@receiver(post_delete, sender=Vote)
+def update_tally_on_delete(sender, instance, **kwargs):
+    key = tally_key(instance)
+    if key:
+        apply_tally_deltas({key: -1})
+
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+def invalidate_results_on_vote_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_competition_cache(instance.competition_id)
+    previous = getattr(instance, '_previous_tally_key', None)
+    if previous and previous[0] != instance.competition_id:
+        invalidate_competition_cache(previous[0])
+
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+def update_voted_cache(sender, instance, created=False, raw=False, **kwargs):
+    if raw or instance.voter_id is None:
+        return
+    if created:
+        add_voted(instance.voter_id, [(instance.competition_id, instance.title)])
+        return
+    # Edited or deleted: the cached titles may no longer be voted.
+    forget_voted(instance.competition_id, instance.voter_id)
+    previous = getattr(instance, '_previous_tally_key', None)
+    if previous and previous[0] != instance.competition_id:
+        forget_voted(previous[0], instance.voter_id)
+
+
+@receiver(post_save, sender=Competition)
+@receiver(post_delete, sender=Competition)
+def invalidate_competition_on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_competition_cache(instance.pk)
+    invalidate_competition_list()
+
+
+# Fields of a user that the company directory does not show; saving only
+# these (e.g. last_login on every login) leaves its version alone.
+DIRECTORY_IGNORED_FIELDS = {'last_login', 'password'}
+
+
+def _changes_directory(update_fields):
+    return update_fields is None or not set(update_fields) <= DIRECTORY_IGNORED_FIELDS
+
+
+@receiver(pre_save, sender=CustomUser)
+def remember_previous_company(sender, instance, update_fields=None, **kwargs):
+    instance._previous_company_id = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is None or 'company' in update_fields:
+        instance._previous_company_id = (
+            CustomUser.objects.filter(pk=instance.pk).values_list('company_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def bump_directory_version_on_user_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _changes_directory(update_fields):
+        return
+    bump_directory_version([instance.company_id, getattr(instance, '_previous_company_id', None)])
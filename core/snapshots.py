@@ -0,0 +1,46 @@
+"""
+Freezes the results of closed competitions into ResultSnapshot.
+
+A competition is closed once its end_date has passed. Its tallies are
+rebuilt from the vote tables first, so the snapshot does not inherit drift
+from bulk paths, and the snapshot is written in the same transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import invalidate_competition_cache
+from core.models import Competition, ResultSnapshot, VoteTally
+from core.services import build_result, result_to_dict
+from core.tallies import rebuild_tallies
+
+
+def unsnapshotted_competitions(today=None):
+    """Closed competitions that have no snapshot yet."""
+    today = today or timezone.localdate()
+    return (
+        Competition.objects
+        .filter(end_date__lt=today, result_snapshot__isnull=True)
+        .order_by('end_date', 'pk')
+    )
+
+
+def take_snapshot(competition_id):
+    """Rebuilds the competition's tallies and stores them as its snapshot."""
+    with transaction.atomic():
+        rebuild_tallies([competition_id])
+        rows = [
+            list(row) for row in
+            VoteTally.objects
+            .filter(competition_id=competition_id, votes__gt=0)
+            .order_by('title', 'nominee_id')
+            .values_list('title', 'nominee_id', 'nominee__username', 'votes')
+        ]
+        result = build_result(competition_id, rows)
+        snapshot = ResultSnapshot.objects.create(
+            competition_id=competition_id,
+            total_votes=result.total_votes,
+            rows=rows,
+            result=result_to_dict(result),
+        )
+        transaction.on_commit(lambda: invalidate_competition_cache(competition_id))
+    return snapshot
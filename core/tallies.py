@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from core.live import publish_tally_deltas
+from core.models import ArchivedVote, Competition, Vote, VoteTally
+from core.versions import bump_results_version
+
+# Keeps the OR-ed key filter well under SQLite's expression depth limit.
+UPDATE_CHUNK_SIZE = 100
+
+
+def tally_key(vote):
+    """(competition_id, title, nominee_id) for a vote, or None if it counts for nobody."""
+    if vote.nominee_id is None:
+        return None
+    return (vote.competition_id, vote.title, vote.nominee_id)
+
+
+def apply_tally_deltas(deltas):
+    """
+    Applies a mapping of tally_key -> delta to VoteTally with F() updates,
+    creating missing rows first. Keys sharing a delta are updated together,
+    so a burst of votes costs a few statements rather than one per nominee.
+    Meant to run inside the transaction that wrote the votes. Bumps the
+    competitions' results_version, and publishes the changes stamped with
+    it to live result streams once the transaction commits.
+    """
+    by_delta = defaultdict(list)
+    for key, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(key)
+    if not by_delta:
+        return
+    with transaction.atomic(savepoint=False):
+        versions = _update_tallies(by_delta)
+    publish_tally_deltas(deltas, versions)
+
+
+def _update_tallies(by_delta):
+    increments = [key for delta, keys in by_delta.items() if delta > 0 for key in keys]
+    if increments:
+        VoteTally.objects.bulk_create(
+            [VoteTally(competition_id=c, title=t, nominee_id=n, votes=0) for c, t, n in increments],
+            ignore_conflicts=True,
+        )
+    for delta, keys in by_delta.items():
+        for start in range(0, len(keys), UPDATE_CHUNK_SIZE):
+            match = reduce(or_, (
+                Q(competition_id=c, title=t, nominee_id=n)
+                for c, t, n in keys[start:start + UPDATE_CHUNK_SIZE]
+            ))
+            rows = VoteTally.objects.filter(match)
+            if delta < 0:
+                rows = rows.filter(votes__gte=-delta)
+            rows.update(votes=F('votes') + delta)
+    return bump_results_version(c for keys in by_delta.values() for c, _, _ in keys)
+
+
+def count_votes(competition_ids=None):
+    """Counter of tally_key -> votes computed from the raw Vote and ArchivedVote tables."""
+    counts = Counter()
+    for model in (Vote, ArchivedVote):
+        votes = model.objects.filter(nominee__isnull=False)
+        if competition_ids is not None:
+            votes = votes.filter(competition_id__in=competition_ids)
+        rows = (
+            votes.values_list('competition_id', 'title', 'nominee_id')
+            .annotate(votes=Count('id'))
+            .order_by()
+        )
+        counts.update({(c, t, n): v for c, t, n, v in rows})
+    return counts
+
+
+def stored_tallies(competition_ids=None):
+    """Counter of tally_key -> votes as currently stored in VoteTally."""
+    tallies = VoteTally.objects.filter(votes__gt=0)
+    if competition_ids is not None:
+        tallies = tallies.filter(competition_id__in=competition_ids)
+    rows = tallies.values_list('competition_id', 'title', 'nominee_id', 'votes')
+    return Counter({(c, t, n): v for c, t, n, v in rows})
+
+
+def diff_tallies(competition_ids=None):
+    """
+    Returns {tally_key: (expected, stored)} for every key where VoteTally
+    disagrees with the Vote table.
+    """
+    expected = count_votes(competition_ids)
+    stored = stored_tallies(competition_ids)
+    return {
+        key: (expected[key], stored[key])
+        for key in expected.keys() | stored.keys()
+        if expected[key] != stored[key]
+    }
+
+
+def rebuild_tallies(competition_ids=None):
+    """Recomputes VoteTally from the Vote and ArchivedVote tables. Returns the number of rows written."""
+    if competition_ids is None:
+        competition_ids = Competition.objects.values_list('pk', flat=True)
+    with transaction.atomic():
+        counts = count_votes(competition_ids)
+        VoteTally.objects.filter(competition_id__in=competition_ids).delete()
+        VoteTally.objects.bulk_create(
+            VoteTally(competition_id=c, title=t, nominee_id=n, votes=v)
+            for (c, t, n), v in counts.items()
+        )
+        bump_results_version(competition_ids)
+    return len(counts)
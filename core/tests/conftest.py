@@ -1,6 +1,22 @@
 import pytest
-from datetime import date
-from core.models import Competition, Vote
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from core.models import Company, Competition, CustomUser, Vote
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+@pytest.fixture
+def plain_static(settings):
+    # The manifest storage needs collectstatic output, which tests don't have.
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
 
 @pytest.fixture
 def sample_competition(db):
@@ -18,3 +34,34 @@ def sample_vote(db, sample_competition):
         description="Vote for the most helpful colleague",
         is_public=True
     )
+
+@pytest.fixture
+def sample_company(db):
+    return Company.objects.create(name="Acme")
+
+@pytest.fixture
+def make_users(db, sample_company):
+    def _make_users(count, prefix="user"):
+        return [
+            CustomUser.objects.create(username=f"{prefix}{i}", company=sample_company)
+            for i in range(count)
+        ]
+    return _make_users
+
+@pytest.fixture
+def cast_vote(db):
+    def _cast_vote(competition, title, voter, nominee, **extra):
+        return Vote.objects.create(
+            competition=competition, title=title, voter=voter, nominee=nominee, **extra
+        )
+    return _cast_vote
+
+@pytest.fixture
+def open_competition(db, sample_company):
+    today = timezone.localdate()
+    return Competition.objects.create(
+        name="Open Competition",
+        start_date=today - timedelta(days=1),
+        end_date=today + timedelta(days=1),
+        company=sample_company,
+    )
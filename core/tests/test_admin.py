@@ -0,0 +1,92 @@
+import pytest
+from django.contrib import admin as django_admin
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import ArchivedVote, Competition, CustomUser, Vote
+
+
+def _add_rows(count, company, offset):
+    users = CustomUser.objects.bulk_create(
+        CustomUser(username=f'row{offset + i}', company=company) for i in range(count)
+    )
+    competitions = Competition.objects.bulk_create(
+        Competition(name=f'Competition {offset + i}', start_date='2024-01-01', end_date='2024-12-31', creator=user)
+        for i, user in enumerate(users)
+    )
+    Vote.objects.bulk_create(
+        Vote(competition=competition, title='Most Helpful', voter=user, nominee=users[0])
+        for competition, user in zip(competitions, users)
+    )
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get(url).status_code == 200
+    return len(queries)
+
+
+@pytest.mark.parametrize('model', ['vote', 'competition', 'customuser'])
+def test_changelist_query_count_does_not_grow_with_rows(admin_client, plain_static, sample_company, model):
+    url = reverse(f'admin:core_{model}_changelist')
+    _add_rows(3, sample_company, offset=0)
+    few = _count_queries(admin_client, url)
+
+    _add_rows(30, sample_company, offset=100)
+    many = _count_queries(admin_client, url)
+
+    assert few == many
+
+
+def test_competition_filter_rejects_non_numeric_ids(admin_client, plain_static, sample_competition):
+    url = reverse('admin:core_vote_changelist')
+
+    assert admin_client.get(url, {'competition__id__exact': sample_competition.pk}).status_code == 200
+    response = admin_client.get(url, {'competition__id__exact': 'abc'})
+    assert response.status_code == 302
+    assert response['Location'].endswith('?e=1')
+
+
+def _search(model_admin, term):
+    request = RequestFactory().get('/', {'q': term})
+    request.resolver_match = None
+    queryset, may_have_duplicates = model_admin.get_search_results(request, model_admin.model.objects.all(), term)
+    return queryset, may_have_duplicates
+
+
+def test_search_matches_each_field_through_its_own_table(sample_company, sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    CustomUser.objects.filter(pk=alice.pk).update(username='alice_smith')
+    helpful = cast_vote(sample_competition, 'Most Helpful', bob, alice)
+    mentor = cast_vote(sample_competition, 'Best Mentor', carol, bob)
+    vote_admin = django_admin.site._registry[Vote]
+
+    queryset, may_have_duplicates = _search(vote_admin, 'SMITH')
+    assert list(queryset) == [helpful]
+    assert not may_have_duplicates
+    assert set(_search(vote_admin, 'mentor')[0]) == {mentor}
+    # Every term has to match some field.
+    assert list(_search(vote_admin, 'smith "most helpful"')[0]) == [helpful]
+    assert not _search(vote_admin, 'smith mentor')[0].exists()
+
+    # No joins: each field is a subquery over one table that its index can serve.
+    sql = str(queryset.query)
+    assert 'JOIN' not in sql
+    assert sql.count('LIKE') == 4
+    # role is not searched: it has no index and is a list filter.
+    assert 'role' not in django_admin.site._registry[CustomUser].search_fields
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='trigram indexes are PostgreSQL only')
+@pytest.mark.parametrize('model', [Vote, ArchivedVote, Competition, CustomUser])
+def test_search_is_served_by_indexes_on_postgresql(model, sample_company):
+    queryset, _ = _search(django_admin.site._registry[model], 'smith')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {sql}', params)
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+    # With sequential scans priced out, any that remain have no index to use.
+    assert 'Seq Scan' not in plan, plan
@@ -0,0 +1,106 @@
+import csv
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from core import archive
+from core.models import ArchivedVote, Company, Competition, CustomUser, Vote, VoteTally
+from core.tallies import diff_tallies, rebuild_tallies
+
+
+@pytest.fixture
+def voted_competition(sample_competition, make_users, cast_vote):
+    alice, *voters = make_users(6)
+    for voter in voters:
+        cast_vote(sample_competition, "Most Helpful", voter, alice, is_public=voter != voters[0])
+    return sample_competition, alice
+
+
+def test_archive_moves_votes_and_keeps_tallies(voted_competition, open_competition, make_users, cast_vote):
+    competition, alice = voted_competition
+    bob, carol = make_users(2, prefix="open")
+    cast_vote(open_competition, "Most Helpful", carol, bob)
+
+    call_command('archive_votes', '--batch-size', '2', stdout=io.StringIO())
+
+    assert not Vote.objects.filter(competition=competition).exists()
+    assert ArchivedVote.objects.filter(competition=competition).count() == 5
+    assert Vote.objects.filter(competition=open_competition).count() == 1
+    assert VoteTally.objects.get(competition=competition, nominee=alice).votes == 5
+    assert diff_tallies() == {}
+    assert Competition.objects.get(pk=competition.pk).votes_archived_at is not None
+    assert not archive.archivable_competitions(open_competition.end_date).exists()
+
+
+def test_archive_resumes_after_interruption(voted_competition, monkeypatch):
+    competition, alice = voted_competition
+    original = archive.archive_batch
+    calls = []
+
+    def failing_batch(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("killed")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(archive, 'archive_batch', failing_batch)
+    with pytest.raises(RuntimeError):
+        archive.archive_competition(competition.pk, batch_size=2)
+    assert (Vote.objects.count(), ArchivedVote.objects.count()) == (3, 2)
+    assert diff_tallies() == {}
+
+    monkeypatch.setattr(archive, 'archive_batch', original)
+    assert archive.archive_competition(competition.pk, batch_size=2) == 3
+    assert (Vote.objects.count(), ArchivedVote.objects.count()) == (0, 5)
+    assert VoteTally.objects.get(competition=competition, nominee=alice).votes == 5
+
+
+def test_rebuild_tallies_counts_archived_votes(voted_competition):
+    competition, alice = voted_competition
+    archive.archive_competition(competition.pk)
+    VoteTally.objects.all().delete()
+
+    rebuild_tallies()
+
+    assert VoteTally.objects.get(competition=competition, nominee=alice).votes == 5
+
+
+def test_archived_votes_are_exported_and_listed(client, voted_competition, make_users, cast_vote):
+    competition, alice = voted_competition
+    archive.archive_batch(competition.pk, batch_size=3)
+    late, = make_users(1, prefix="late")
+    cast_vote(competition, "Best Mentor", late, alice)
+    out = io.StringIO()
+
+    call_command('export_votes', str(competition.id), stdout=out)
+
+    exported = [int(row['id']) for row in csv.DictReader(io.StringIO(out.getvalue()))]
+    assert len(exported) == 6
+    assert exported == sorted(exported)
+
+    CustomUser.objects.filter(pk=alice.pk).update(is_staff=True)
+    client.force_login(alice)
+    url = reverse('core:competition-votes', args=[competition.id])
+    listed, cursor = [], None
+    while True:
+        body = client.get(url, {'limit': 3, **({'cursor': cursor} if cursor else {})}).json()
+        listed += [row['id'] for row in body['results']]
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert listed == exported
+
+
+def test_moving_a_competition_moves_its_archived_votes(voted_competition, sample_company, make_users):
+    competition, alice = voted_competition
+    call_command('archive_votes', stdout=io.StringIO())
+    other = Company.objects.create(name="Other")
+    mover = CustomUser.objects.create(username="mover", company=other)
+
+    competition.creator = mover
+    competition.save()
+
+    assert ArchivedVote.objects.for_company(other).count() == 5
+    assert not ArchivedVote.objects.exclude(company=other).exists()
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from core.cache import cache_stats, get_or_compute, reset_cache_stats
+from core.models import Competition
+from core.services import get_active_competitions, get_cached_winner
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    reset_cache_stats()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 'value'
+
+    assert get_or_compute('scope', 'thing', compute) == 'value'
+    assert get_or_compute('scope', 'thing', compute) == 'value'
+
+    assert len(calls) == 1
+    assert cache_stats()['thing'] == {'hit': 1, 'miss': 1, 'compute': 1}
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_or_compute('scope', 'slow', compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_cached_winner_invalidated_by_votes(
+    sample_competition, make_users, cast_vote, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    alice, bob, carol = make_users(3)
+    with django_capture_on_commit_callbacks(execute=True):
+        cast_vote(sample_competition, "Most Helpful", bob, alice)
+
+    assert get_cached_winner(sample_competition.id).winner.nominee_id == alice.id
+    with django_assert_num_queries(0):
+        get_cached_winner(sample_competition.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        cast_vote(sample_competition, "Most Helpful", alice, carol)
+        cast_vote(sample_competition, "Best Mentor", alice, carol)
+
+    assert get_cached_winner(sample_competition.id).winner.nominee_id == carol.id
+
+
+def test_active_competitions_invalidated_by_competition_save(
+    open_competition, sample_competition, django_capture_on_commit_callbacks
+):
+    assert [c['id'] for c in get_active_competitions()] == [open_competition.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        another = Competition.objects.create(
+            name="Another", start_date=open_competition.start_date, end_date=open_competition.end_date
+        )
+
+    assert [c['id'] for c in get_active_competitions()] == [open_competition.id, another.id]
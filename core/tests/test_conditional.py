@@ -0,0 +1,139 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import user_logged_in
+from django.urls import reverse
+
+from core.models import Company, Competition, CustomUser
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+def test_results_answer_304_until_a_vote_changes(
+    client, async_client, admin_user, sample_competition, make_users, cast_vote, django_assert_num_queries
+):
+    alice, bob, carol = make_users(3)
+    client.force_login(admin_user)
+    async_client.force_login(admin_user)
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+    url = reverse('core:competition-results', args=[sample_competition.id])
+
+    first = client.get(url)
+    assert first['ETag'] and first['Last-Modified']
+    assert 'no-cache' in first['Cache-Control']
+    assert 'private' in first['Cache-Control']
+
+    # Session and user, then only the version lookup runs before answering.
+    with django_assert_num_queries(3):
+        cached = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert cached.status_code == 304
+    assert cached['ETag'] == first['ETag']
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code == 304
+    async_url = reverse('core:competition-results-async', args=[sample_competition.id])
+    assert _await(async_client.get, async_url, headers={'If-None-Match': first['ETag']}).status_code == 304
+
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+
+    fresh = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert fresh.status_code == 200
+    assert fresh['ETag'] != first['ETag']
+    assert fresh.json()['total_votes'] == 2
+
+
+def test_full_competition_save_keeps_results_version(sample_competition, make_users, cast_vote):
+    stale = Competition.objects.get(pk=sample_competition.pk)
+    alice, bob = make_users(2)
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+
+    stale.name = "Renamed"
+    stale.save()
+
+    assert Competition.objects.get(pk=sample_competition.pk).results_version == 1
+
+
+def test_saves_that_insert_write_every_field(sample_company):
+    deleted = Company.objects.create(name="Deleted")
+    deleted.delete()
+    deleted.save()
+    assert Company.objects.filter(name="Deleted").exists()
+
+    preset = Company(pk=9999, name="Preset pk")
+    preset.save()
+    Company.objects.filter(pk=9999).delete()
+    preset.save(force_insert=True)
+    assert Company.objects.get(pk=9999).name == "Preset pk"
+
+
+def test_competition_list_etag_follows_competition_changes(
+    client, open_competition, make_users, django_capture_on_commit_callbacks
+):
+    user, = make_users(1)
+    with django_capture_on_commit_callbacks(execute=True):
+        open_competition.creator = user
+        open_competition.save()
+    client.force_login(user)
+    url = reverse('core:competitions')
+
+    first = client.get(url)
+    assert [c['id'] for c in first.json()['results']] == [open_competition.id]
+    assert 'private' in first['Cache-Control']
+    assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Competition.objects.create(
+            name="Other company", start_date=open_competition.start_date, end_date=open_competition.end_date,
+        )
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 200
+
+
+def test_competition_list_etag_comes_from_the_database(client, open_competition, make_users):
+    user, = make_users(1)
+    client.force_login(user)
+    url = reverse('core:competitions')
+    first = client.get(url)
+    assert first['Last-Modified']
+
+    # Changes made elsewhere, e.g. by another instance whose cache version
+    # bump this process never sees: the on_commit callbacks do not run.
+    Competition.objects.filter(pk=open_competition.pk).update(name="Renamed")
+    open_competition.refresh_from_db()
+    open_competition.save()
+    renamed = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert renamed.status_code == 200
+    assert renamed.json()['results'][0]['name'] == "Renamed"
+    assert client.get(url, HTTP_IF_NONE_MATCH=renamed['ETag']).status_code == 304
+
+    open_competition.delete()
+    emptied = client.get(url, HTTP_IF_NONE_MATCH=renamed['ETag'])
+    assert emptied.status_code == 200
+    assert emptied.json()['results'] == []
+
+
+def test_company_directory_etag_ignores_logins(client, sample_company, make_users):
+    users = make_users(3)
+    client.force_login(users[0])
+    url = reverse('core:company-users', args=[sample_company.id])
+    first = client.get(url)
+
+    user_logged_in.send(sender=CustomUser, request=None, user=users[1])
+    assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    make_users(1, prefix="new")
+    response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 4
+
+
+def test_moving_a_user_bumps_both_directories(sample_company, make_users):
+    user, = make_users(1)
+    other = Company.objects.create(name="Other")
+    before = Company.objects.get(pk=sample_company.pk).directory_version
+
+    user.company = other
+    user.save()
+
+    assert Company.objects.get(pk=sample_company.pk).directory_version == before + 1
+    assert Company.objects.get(pk=other.pk).directory_version == 1
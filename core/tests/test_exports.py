@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.exports import iter_results, iter_votes
+from core.models import ArchivedVote, CustomUser, Vote
+
+
+def _stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def _staff(make_users):
+    user, = make_users(1, prefix="staff")
+    CustomUser.objects.filter(pk=user.pk).update(is_staff=True)
+    return user
+
+
+def test_export_votes_command_csv(sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+    cast_vote(sample_competition, "Most Helpful", carol, alice, award="Mug")
+    out = io.StringIO()
+
+    call_command('export_votes', str(sample_competition.id), '--chunk-size', '1', stdout=out)
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [(r['voter'], r['nominee'], r['award']) for r in rows] == [
+        (bob.username, alice.username, ''),
+        (carol.username, alice.username, 'Mug'),
+    ]
+
+
+def test_export_results_command_ndjson(sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+    out = io.StringIO()
+
+    call_command('export_votes', str(sample_competition.id), '--kind', 'results', '--format', 'ndjson', stdout=out)
+
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {'title': "Most Helpful", 'nominee': alice.username, 'votes': 2},
+    ]
+
+
+def test_export_view_reads_each_table_once_per_chunk(
+    client, sample_competition, make_users, cast_vote, django_assert_num_queries
+):
+    staff = _staff(make_users)
+    voters = make_users(5)
+    for voter in voters:
+        cast_vote(sample_competition, "Most Helpful", voter, staff)
+    client.force_login(staff)
+    url = reverse('core:competition-export', args=[sample_competition.id])
+
+    response = client.get(url, {'format': 'ndjson'})
+    # One chunk each from the live and archived votes.
+    with django_assert_num_queries(2):
+        lines = _stream(response).splitlines()
+
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert [json.loads(line)['voter'] for line in lines] == [v.username for v in voters]
+
+
+def test_export_view_streams_under_asgi(async_client, sample_competition, make_users, cast_vote):
+    staff = _staff(make_users)
+    voter, = make_users(1)
+    cast_vote(sample_competition, "Most Helpful", voter, staff)
+    async_client.force_login(staff)
+
+    async def fetch():
+        response = await async_client.get(reverse('core:competition-export', args=[sample_competition.id]))
+        return response.status_code, b''.join([chunk async for chunk in response.streaming_content])
+
+    status, content = async_to_sync(fetch)()
+
+    assert status == 200
+    assert content.decode().splitlines()[1].startswith(
+        f"{sample_competition.vote_set.get().pk},Most Helpful,{voter.username},{staff.username}"
+    )
+
+
+def test_export_view_is_staff_only(client, sample_competition, make_users):
+    user, = make_users(1)
+    client.force_login(user)
+    response = client.get(reverse('core:competition-export', args=[sample_competition.id]))
+    assert response.status_code == 403
+
+
+def test_exports_page_through_small_chunks(sample_competition, make_users, cast_vote):
+    alice, bob, *voters = make_users(7)
+    for voter in voters[:3]:
+        cast_vote(sample_competition, "Most Helpful", voter, alice)
+    for voter in voters[3:]:
+        cast_vote(sample_competition, "Most Helpful", voter, bob)
+        cast_vote(sample_competition, "Best Mentor", voter, alice)
+
+    assert [row[1:] for row in iter_results(sample_competition.id, chunk_size=1)] == [
+        (alice.username, 2), (alice.username, 3), (bob.username, 2),
+    ]
+
+    # Move every other vote to the archive, so the two tables interleave by id.
+    ids = list(Vote.objects.order_by('id').values_list('id', flat=True))
+    for vote in Vote.objects.filter(pk__in=ids[::2]):
+        ArchivedVote.objects.create(**{f.attname: getattr(vote, f.attname) for f in Vote._meta.concrete_fields})
+        vote.delete()
+
+    assert [row[0] for row in iter_votes(sample_competition.id, chunk_size=2)] == ids
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from core.models import Company, CustomUser, UserRole
+
+CSV = """username,email,first_name,last_name,company,role,password
+ana,ana@acme.test,Ana,Diaz,Acme,COMPANY_ADMIN,s3cret-pass
+bruno,,Bruno,,Globex,,
+ana,dup@acme.test,,,Acme,,
+,missing@acme.test,,,Acme,,
+carla,carla@acme.test,Carla,Paz,,BOSS,
+"""
+
+
+@pytest.fixture
+def fast_hashing(settings):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def _import(path, *args):
+    out, err = io.StringIO(), io.StringIO()
+    call_command('import_users', str(path), '--workers', '0', *args, stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue()
+
+
+def test_import_users_creates_users_and_companies(tmp_path, db, fast_hashing):
+    path = tmp_path / 'users.csv'
+    path.write_text(CSV)
+
+    out, err = _import(path, '--batch-size', '2')
+
+    assert 'Imported 2 users' in out
+    assert 'Line 5: username is required.' in err
+    assert "Line 6: unknown role 'BOSS'." in err
+    ana = CustomUser.objects.get(username='ana')
+    assert ana.company.name == 'Acme'
+    assert ana.role == UserRole.COMPANY_ADMIN
+    assert ana.check_password('s3cret-pass')
+    bruno = CustomUser.objects.get(username='bruno')
+    assert bruno.company.name == 'Globex'
+    assert not bruno.has_usable_password()
+
+
+def test_import_users_is_idempotent(tmp_path, db, fast_hashing):
+    path = tmp_path / 'users.csv'
+    path.write_text(CSV)
+    _import(path)
+
+    out, _ = _import(path, '--company', 'Acme')
+
+    assert 'Imported 0 users' in out
+    assert CustomUser.objects.count() == 2
+    assert Company.objects.count() == 2
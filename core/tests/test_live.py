@@ -0,0 +1,199 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connections
+from django.urls import reverse
+
+from core import live, views
+from core.live import broker
+from core.models import Company, CustomUser, Vote
+
+
+def _run(coroutine_function):
+    return async_to_sync(coroutine_function)()
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+def _data(chunk):
+    event, *_, data = chunk.strip().split('\n')
+    return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+
+def test_publish_from_another_thread_reaches_subscribers():
+    async def scenario():
+        subscription = broker.subscribe(1)
+        other = broker.subscribe(2)
+        try:
+            await sync_to_async(broker.publish, thread_sensitive=False)(1, {'changes': []})
+            assert await asyncio.wait_for(subscription.get(), 1) == {'changes': []}
+            assert other.queue.empty()
+        finally:
+            broker.unsubscribe(subscription)
+            broker.unsubscribe(other)
+        assert not broker.subscriptions
+
+    _run(scenario)
+
+
+def test_committed_votes_are_published(
+    open_competition, make_users, django_capture_on_commit_callbacks
+):
+    voter, alice = make_users(2)
+
+    def vote():
+        with django_capture_on_commit_callbacks(execute=True):
+            Vote.objects.create(competition=open_competition, title='Most Helpful', voter=voter, nominee=alice)
+
+    async def scenario():
+        subscription = broker.subscribe(open_competition.pk)
+        try:
+            await sync_to_async(vote)()
+            return await asyncio.wait_for(subscription.get(), 1)
+        finally:
+            broker.unsubscribe(subscription)
+
+    assert _run(scenario) == {
+        'competition': open_competition.pk,
+        'changes': [{'title': 'Most Helpful', 'nominee': alice.pk, 'delta': 1}],
+        'version': 1,
+    }
+
+
+def test_live_stream_sends_snapshot_then_changes(async_client, admin_user, settings, sample_competition):
+    async_client.force_login(admin_user)
+    settings.LIVE_RESULTS_HEARTBEAT = 60
+    settings.LIVE_RESULTS_MAX_SECONDS = 0.5
+    url = reverse('core:competition-live', args=[sample_competition.pk])
+    change = {'competition': sample_competition.pk, 'changes': [{'title': 'X', 'nominee': 1, 'delta': 1}]}
+
+    async def scenario():
+        response = await async_client.get(url)
+        assert response['Content-Type'] == 'text/event-stream'
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == 2:
+                broker.publish(sample_competition.pk, change)
+        return chunks
+
+    retry, snapshot, tally = _run(scenario)
+    assert retry.startswith('retry:')
+    event, data = _data(snapshot)
+    assert (event, data['competition']) == ('snapshot', sample_competition.pk)
+    assert _data(tally) == ('tally', change)
+    assert not broker.subscriptions
+
+
+def test_live_stream_heartbeats_and_ends(async_client, admin_user, settings, sample_competition):
+    async_client.force_login(admin_user)
+    settings.LIVE_RESULTS_HEARTBEAT = 0
+    settings.LIVE_RESULTS_MAX_SECONDS = 0.05
+    url = reverse('core:competition-live', args=[sample_competition.pk])
+
+    async def scenario():
+        response = await async_client.get(url)
+        return [chunk async for chunk in response.streaming_content]
+
+    chunks = _run(scenario)
+    assert chunks[2] == b': heartbeat\n\n'
+    assert not broker.subscriptions
+
+
+@pytest.mark.parametrize('competition_exists', [True, False])
+def test_live_stream_errors(client, async_client, admin_user, sample_competition, competition_exists):
+    client.force_login(admin_user)
+    async_client.force_login(admin_user)
+    competition_id = sample_competition.pk if competition_exists else 0
+    url = reverse('core:competition-live', args=[competition_id])
+    if competition_exists:
+        assert client.get(url).status_code == 501
+    else:
+        assert _await(async_client.get, url).status_code == 404
+
+
+def test_live_stream_requires_login_and_company(async_client, sample_competition, make_users):
+    creator, = make_users(1)
+    sample_competition.creator = creator
+    sample_competition.save()
+    url = reverse('core:competition-live', args=[sample_competition.pk])
+    assert _await(async_client.get, url).status_code == 401
+
+    outsider = CustomUser.objects.create(username="outsider", company=Company.objects.create(name="Other"))
+    async_client.force_login(outsider)
+    assert _await(async_client.get, url).status_code == 403
+    assert not broker.subscriptions
+
+
+def test_live_stream_skips_changes_already_in_the_snapshot(
+    async_client, admin_user, settings, monkeypatch, open_competition, make_users, django_capture_on_commit_callbacks
+):
+    async_client.force_login(admin_user)
+    settings.LIVE_RESULTS_HEARTBEAT = 60
+    settings.LIVE_RESULTS_MAX_SECONDS = 0.5
+    voter, alice, bob = make_users(3)
+    url = reverse('core:competition-live', args=[open_competition.pk])
+
+    def vote(title):
+        with django_capture_on_commit_callbacks(execute=True):
+            Vote.objects.create(competition=open_competition, title=title, voter=voter, nominee=alice)
+
+    read_snapshot = views.aget_versioned_winner
+
+    async def vote_during_snapshot(competition_id):
+        # Commits after the stream subscribed, before its snapshot is read.
+        await sync_to_async(vote)('Most Helpful')
+        return await read_snapshot(competition_id)
+
+    monkeypatch.setattr(views, 'aget_versioned_winner', vote_during_snapshot)
+
+    async def scenario():
+        response = await async_client.get(url)
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == 2:
+                await sync_to_async(vote)('Best Mentor')
+        return chunks
+
+    retry, snapshot, tally = _run(scenario)
+    event, data = _data(snapshot)
+    assert (event, data['version'], data['total_votes']) == ('snapshot', 1, 1)
+    event, data = _data(tally)
+    assert (event, data['version']) == ('tally', 2)
+    assert data['changes'] == [{'title': 'Best Mentor', 'nominee': alice.pk, 'delta': 1}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_live_stream_releases_its_connection_after_each_snapshot(
+    async_client, admin_user, settings, monkeypatch, sample_competition
+):
+    async_client.force_login(admin_user)
+    settings.LIVE_RESULTS_HEARTBEAT = 60
+    settings.LIVE_RESULTS_MAX_SECONDS = 0.5
+    closed = []
+    monkeypatch.setattr(connections['default'], 'close', lambda: closed.append(True))
+    monkeypatch.setattr(live, 'QUEUE_SIZE', 1)
+    url = reverse('core:competition-live', args=[sample_competition.pk])
+    change = {'competition': sample_competition.pk, 'changes': []}
+
+    async def scenario():
+        response = await async_client.get(url)
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == 2:
+                assert closed == [True]
+                for _ in range(3):
+                    broker.publish(sample_competition.pk, change)
+        return chunks
+
+    retry, first, second = _run(scenario)
+    assert [_data(first)[0], _data(second)[0]] == ['snapshot', 'snapshot']
+    assert closed == [True, True]
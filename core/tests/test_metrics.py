@@ -0,0 +1,110 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core import metrics
+from core.cache import reset_cache_stats
+from core.middleware import PerformanceMiddleware
+from core.models import Competition
+
+
+@pytest.fixture(autouse=True)
+def perf_settings(settings):
+    settings.PERF_INSTRUMENTATION = True
+    settings.PERF_SAMPLE_RATE = 1.0
+    settings.PERF_SLOW_REQUEST_MS = 10_000
+    settings.PERF_SLOW_QUERY_MS = 10_000
+    settings.PERF_DUPLICATE_QUERY_THRESHOLD = 3
+    settings.METRICS_TOKEN = 'secret'
+    metrics.registry.reset()
+    reset_cache_stats()
+    yield settings
+    metrics.registry.reset()
+
+
+@pytest.fixture
+def perf_log(caplog):
+    logger = logging.getLogger('core.performance')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def _scrape(client):
+    response = client.get(reverse('core:metrics'), HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == 200
+    return response.content.decode()
+
+
+def test_sampled_request_reports_queries(client, admin_user, sample_competition, perf_log):
+    client.force_login(admin_user)
+    url = reverse('core:competition-results', args=[sample_competition.pk])
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert 'db;dur=' in response['Server-Timing']
+    record = json.loads(perf_log.records[-1].getMessage())
+    assert record['view'] == 'core:competition-results'
+    assert record['db_queries'] > 0
+    assert perf_log.records[-1].levelno == logging.INFO
+
+    body = _scrape(client)
+    assert 'http_request_duration_seconds_count{view="core:competition-results",method="GET"} 1' in body
+    assert 'db_queries_per_request_count{view="core:competition-results",method="GET"} 1' in body
+    assert 'http_requests_total{view="core:competition-results",method="GET",status="200"} 1' in body
+
+
+def test_duplicate_queries_are_flagged(sample_competition, perf_log):
+    def view(request):
+        for _ in range(3):
+            Competition.objects.filter(pk=sample_competition.pk).exists()
+        return HttpResponse()
+
+    PerformanceMiddleware(view)(RequestFactory().get('/'))
+
+    record = json.loads(perf_log.records[-1].getMessage())
+    assert perf_log.records[-1].levelno == logging.WARNING
+    assert record['duplicate_queries'][0]['count'] == 3
+
+
+def test_unsampled_requests_only_record_wall_time(client, admin_user, perf_settings, sample_competition, perf_log):
+    perf_settings.PERF_SAMPLE_RATE = 0
+    client.force_login(admin_user)
+    response = client.get(reverse('core:competition-results', args=[sample_competition.pk]))
+
+    assert 'Server-Timing' not in response
+    assert not perf_log.records
+    body = _scrape(client)
+    assert 'http_request_duration_seconds_count{view="core:competition-results",method="GET"} 1' in body
+    assert 'db_queries_per_request_count{view="core:competition-results"' not in body
+
+
+def test_async_views_are_instrumented(async_client, admin_user, sample_competition):
+    async_client.force_login(admin_user)
+    url = reverse('core:competition-results-async', args=[sample_competition.pk])
+
+    async def call():
+        return await async_client.get(url)
+    response = async_to_sync(call)()
+
+    assert response.status_code == 200
+    assert 'db;dur=' in response['Server-Timing']
+    assert not response['Server-Timing'].endswith('"0 queries"')
+
+
+def test_metrics_endpoint_requires_token_or_staff(client, django_user_model, sample_competition):
+    url = reverse('core:metrics')
+    assert client.get(url).status_code == 403
+    assert client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+
+    client.force_login(django_user_model.objects.create(username='ops', is_staff=True))
+    client.get(reverse('core:competition-results', args=[sample_competition.pk]))
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    assert 'cache_requests_total{name="winner",event="miss"} 1' in response.content.decode()
@@ -0,0 +1,47 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from core.models import Vote
+
+unique_votes = import_module('core.migrations.0003_vote_indexes')
+
+
+@pytest.fixture
+def without_unique_vote_constraint(transactional_db):
+    # The state migration 0003 starts from: votes are not unique yet.
+    [constraint] = [c for c in Vote._meta.constraints if c.name == 'unique_vote_per_voter_and_title']
+    with connection.schema_editor() as editor:
+        editor.remove_constraint(Vote, constraint)
+    yield
+    Vote.objects.all().delete()
+    with connection.schema_editor() as editor:
+        editor.add_constraint(Vote, constraint)
+
+
+def test_unique_vote_migration_refuses_existing_duplicates(
+    without_unique_vote_constraint, sample_competition, make_users, cast_vote, monkeypatch,
+):
+    alice, bob = make_users(2)
+    cast_vote(sample_competition, 'Most Helpful', alice, bob)
+    cast_vote(sample_competition, 'Most Helpful', alice, alice)
+    cast_vote(sample_competition, 'Best Mentor', alice, bob)
+    # Anonymous votes are outside the constraint.
+    cast_vote(sample_competition, 'Most Helpful', None, bob)
+    cast_vote(sample_competition, 'Most Helpful', None, bob)
+
+    with pytest.raises(RuntimeError) as excinfo:
+        unique_votes.check_duplicate_votes(apps, None)
+    message = str(excinfo.value)
+    assert f"competition={sample_competition.pk} voter={alice.pk} title='Most Helpful': 2 votes" in message
+    assert 'Best Mentor' not in message
+    assert 'voter=None' not in message
+
+    monkeypatch.setattr(unique_votes, 'REPORTED_DUPLICATES', 0)
+    with pytest.raises(RuntimeError, match=r'\.\.\.$'):
+        unique_votes.check_duplicate_votes(apps, None)
+
+    Vote.objects.filter(voter=alice, title='Most Helpful', nominee=alice).delete()
+    unique_votes.check_duplicate_votes(apps, None)
@@ -1,5 +1,8 @@
 #from django.test import TestCase
-from core.models import Competition
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from core.models import Company, Competition, Vote
 from datetime import date
 
 def test_competition_str_representation(sample_competition):
@@ -8,3 +11,71 @@ def test_competition_str_representation(sample_competition):
 def test_competition_dates(sample_competition):
     assert sample_competition.start_date == date(2024, 1, 1)
     assert sample_competition.end_date == date(2024, 12, 31)
+
+def test_vote_unique_per_voter_and_title(sample_competition, make_users, cast_vote):
+    alice, bob = make_users(2)
+    cast_vote(sample_competition, "Most Helpful", alice, bob)
+
+    duplicate = Vote(competition=sample_competition, title="Most Helpful", voter=alice, nominee=alice)
+    with pytest.raises(ValidationError):
+        duplicate.validate_constraints()
+    with pytest.raises(IntegrityError):
+        duplicate.save()
+
+def test_vote_same_voter_other_title_allowed(sample_competition, make_users, cast_vote):
+    alice, bob = make_users(2)
+    cast_vote(sample_competition, "Most Helpful", alice, bob)
+    cast_vote(sample_competition, "Best Mentor", alice, bob)
+    assert Vote.objects.filter(voter=alice).count() == 2
+
+def test_votes_without_voter_are_not_unique(sample_competition):
+    for _ in range(2):
+        Vote.objects.create(competition=sample_competition, title="Most Helpful")
+    assert Vote.objects.count() == 2
+
+def test_competition_and_votes_take_the_creator_company(sample_company, make_users):
+    alice, bob = make_users(2)
+    competition = Competition.objects.create(
+        name="Tenant", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), creator=alice
+    )
+    vote = Vote.objects.create(competition=competition, title="Most Helpful", voter=alice, nominee=bob)
+    assert competition.company == vote.company == sample_company
+    assert list(Vote.objects.for_company(sample_company)) == [vote]
+
+def test_moving_a_competition_moves_its_votes(sample_company, make_users):
+    alice, bob = make_users(2)
+    competition = Competition.objects.create(
+        name="Tenant", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), creator=alice
+    )
+    Vote.objects.create(competition=competition, title="Most Helpful", voter=alice, nominee=bob)
+    other = Company.objects.create(name="Other Co")
+    bob.company = other
+    bob.save()
+
+    competition.creator = bob
+    competition.save()
+
+    assert Vote.objects.for_company(other).count() == 1
+    assert not Vote.objects.for_company(sample_company).exists()
+
+def test_competition_stays_put_when_its_creator_moves(sample_company, make_users):
+    alice, = make_users(1)
+    competition = Competition.objects.create(
+        name="Tenant", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), creator=alice
+    )
+    other = Company.objects.create(name="Other Co")
+    alice.company = other
+    alice.save()
+
+    competition.name = "Renamed"
+    competition.save()
+
+    assert Competition.objects.get(pk=competition.pk).company == sample_company
+
+def test_explicit_company_is_kept(sample_company, make_users):
+    alice, = make_users(1)
+    other = Company.objects.create(name="Other Co")
+    competition = Competition.objects.create(
+        name="Tenant", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), creator=alice, company=other
+    )
+    assert Competition.objects.get(pk=competition.pk).company == other
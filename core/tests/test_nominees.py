@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from django.urls import reverse
+
+from core import nominees
+from core.models import Company, CustomUser
+from core.nominees import NomineeIndex, clear_indexes, get_index
+
+URL_NAME = 'core:company-nominees'
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    # Ids and versions repeat between tests, which roll back the database.
+    clear_indexes()
+    yield
+    clear_indexes()
+
+
+def _usernames(results):
+    return [row['username'] for row in results]
+
+
+def test_index_matches_prefixes_of_any_name():
+    index = NomineeIndex([
+        (1, 'jperez', 'José', 'Pérez'),
+        (2, 'jpastor', 'Juana', 'Pastor'),
+        (3, 'mjose', 'María José', 'Gómez'),
+        (4, 'alice', 'Alice', 'Josephson'),
+    ])
+
+    assert _usernames(index.search('JOSE')) == ['mjose', 'jperez', 'alice']
+    assert _usernames(index.search('maria jo')) == ['mjose']
+    assert _usernames(index.search('jp')) == ['jpastor', 'jperez']
+    assert _usernames(index.search('j', limit=2, exclude=(2,))) == ['mjose', 'jperez']
+    assert index.search('') == []
+    assert index.search('zz') == []
+
+
+def test_endpoint_searches_the_callers_company(client, sample_company, make_users):
+    caller, *_ = make_users(3, prefix='ana')
+    CustomUser.objects.filter(username='ana2').update(is_active=False)
+    outsider = CustomUser.objects.create(username='ana_elsewhere', company=Company.objects.create(name='Other'))
+    client.force_login(caller)
+    url = reverse(URL_NAME, args=[sample_company.id])
+
+    response = client.get(url, {'q': 'ANA'})
+
+    assert response.status_code == 200
+    assert _usernames(response.json()['results']) == ['ana1']
+    assert client.get(reverse(URL_NAME, args=[outsider.company_id]), {'q': 'ana'}).status_code == 403
+    assert client.get(url, {'q': 'ana', 'limit': '0'}).status_code == 400
+
+
+def test_endpoint_rebuilds_index_after_user_changes(client, sample_company, make_users):
+    caller, = make_users(1, prefix='caller')
+    client.force_login(caller)
+    url = reverse(URL_NAME, args=[sample_company.id])
+    first = client.get(url, {'q': 'bo'})
+    assert first.json()['results'] == []
+    assert client.get(url, {'q': 'bo'}, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    bob = CustomUser.objects.create(username='bob', first_name='Bob', company=sample_company)
+
+    response = client.get(url, {'q': 'bo'}, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 200
+    assert [row['id'] for row in response.json()['results']] == [bob.id]
+
+
+def test_index_is_reused_while_directory_is_unchanged(sample_company, make_users, django_assert_num_queries):
+    make_users(3)
+    version = Company.objects.get(pk=sample_company.pk).directory_version
+    index = get_index(sample_company.id, version)
+
+    with django_assert_num_queries(0):
+        assert get_index(sample_company.id, version) is index
+    assert len(index) == 3
+
+
+def test_rebuild_keeps_serving_the_previous_index(monkeypatch):
+    building, release = threading.Event(), threading.Event()
+
+    def rows(company_id):
+        if company_id == 1 and previous is not None:
+            building.set()
+            assert release.wait(5)
+        return [(company_id, f'user{company_id}', '', '')]
+
+    monkeypatch.setattr(nominees, '_nominee_rows', rows)
+    previous = None
+    previous = get_index(1, version=1)
+    builder = threading.Thread(target=get_index, args=(1, 2))
+    builder.start()
+    assert building.wait(5)
+
+    # Company 1 is being rebuilt: its old index is served and other
+    # companies build without waiting for it.
+    assert get_index(1, version=2) is previous
+    assert get_index(2, version=1).version == 1
+
+    release.set()
+    builder.join(5)
+    assert get_index(1, version=2).version == 2
+
+
+def test_admin_autocomplete_matches_prefixes(admin_client, sample_company, make_users):
+    CustomUser.objects.create(username='alice', company=sample_company)
+    CustomUser.objects.create(username='malice', company=sample_company)
+
+    response = admin_client.get(reverse('admin:autocomplete'), {
+        'app_label': 'core', 'model_name': 'vote', 'field_name': 'nominee', 'term': 'ali',
+    })
+
+    assert [row['text'] for row in response.json()['results']] == ['alice']
@@ -0,0 +1,148 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import CustomUser, Vote
+from core.pagination import (
+    EstimatedCountPaginator, InvalidCursor, decode_cursor, encode_cursor, estimate_count,
+)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(123)) == 123
+    for cursor in ('garbage', encode_cursor('x')):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+def _walk(client, url, limit):
+    pages, cursor = [], None
+    while True:
+        params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+        with CaptureQueriesContext(connection) as queries:
+            body = client.get(url, params).json()
+        pages.append((body['results'], len(queries)))
+        cursor = body['next_cursor']
+        if not cursor:
+            return pages
+
+
+def test_company_users_pages_cost_the_same(client, sample_company, make_users):
+    users = make_users(25)
+    client.force_login(users[0])
+
+    pages = _walk(client, reverse('core:company-users', args=[sample_company.id]), limit=10)
+
+    assert [len(rows) for rows, _ in pages] == [10, 10, 5]
+    assert [row['id'] for rows, _ in pages for row in rows] == sorted(u.id for u in users)
+    assert len({query_count for _, query_count in pages}) == 1
+
+
+def test_competition_votes_hide_private_votes_from_members(client, sample_competition, make_users):
+    creator, *voters = make_users(6)
+    sample_competition.creator = creator
+    sample_competition.save()
+    Vote.objects.bulk_create(
+        Vote(competition=sample_competition, title="Most Helpful", voter=voter, nominee=creator, is_public=i % 2 == 0)
+        for i, voter in enumerate(voters)
+    )
+    url = reverse('core:competition-votes', args=[sample_competition.id])
+
+    client.force_login(creator)
+    member_rows = [row for rows, _ in _walk(client, url, limit=2) for row in rows]
+    CustomUser.objects.filter(pk=creator.pk).update(is_staff=True)
+    staff_rows = [row for rows, _ in _walk(client, url, limit=2) for row in rows]
+
+    assert len(member_rows) == 3
+    assert all(row['is_public'] for row in member_rows)
+    assert len(staff_rows) == 5
+
+
+def test_listing_requires_same_company(client, sample_company, make_users):
+    outsider = CustomUser.objects.create(username="outsider")
+    client.force_login(outsider)
+    assert client.get(reverse('core:company-users', args=[sample_company.id])).status_code == 403
+
+
+def test_listing_rejects_bad_cursor(client, sample_company, make_users):
+    user, = make_users(1)
+    client.force_login(user)
+    response = client.get(reverse('core:company-users', args=[sample_company.id]), {'cursor': 'bad'})
+    assert response.status_code == 400
+
+
+def test_estimated_count_paginator_falls_back_to_exact_count(sample_competition):
+    Vote.objects.bulk_create(Vote(competition=sample_competition, title=f"T{i}") for i in range(5))
+    assert estimate_count(Vote.objects.all()) is None
+    assert EstimatedCountPaginator(Vote.objects.order_by('pk'), 2).count == 5
+
+
+def test_estimated_count_paginator_uses_large_estimates(monkeypatch, sample_competition, django_assert_num_queries):
+    monkeypatch.setattr('core.pagination.estimate_count', lambda queryset: 2_000_000)
+    paginator = EstimatedCountPaginator(Vote.objects.order_by('pk'), 100)
+    with django_assert_num_queries(0):
+        assert paginator.count == 2_000_000
+    assert paginator.num_pages == 20_000
+
+
+class _FakeCursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+
+class _FakeConnection:
+    vendor = 'postgresql'
+    ops = connection.ops
+
+    def __init__(self, row):
+        self.fake_cursor = _FakeCursor(row)
+
+    def cursor(self):
+        return self.fake_cursor
+
+
+@pytest.mark.parametrize('plan', [
+    [{'Plan': {'Node Type': 'Seq Scan', 'Plan Rows': 1234}}],
+    '[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}]',
+])
+def test_estimate_count_explains_filtered_querysets(monkeypatch, plan):
+    # psycopg2 decodes EXPLAIN's json column; other drivers may return text.
+    fake = _FakeConnection((plan,))
+    monkeypatch.setattr('core.pagination.connections', {'default': fake})
+    assert estimate_count(Vote.objects.filter(title='Most Helpful').order_by('pk')) == 1234
+    [(sql, params)] = fake.fake_cursor.executed
+    assert sql.startswith('EXPLAIN (FORMAT JSON) SELECT')
+    assert 'ORDER BY' not in sql
+    assert params == ('Most Helpful',)
+
+
+@pytest.mark.parametrize('reltuples, expected', [(5e6, 5_000_000), (-1, None), (0, None)])
+def test_estimate_count_reads_reltuples_for_whole_tables(monkeypatch, reltuples, expected):
+    fake = _FakeConnection((reltuples,))
+    monkeypatch.setattr('core.pagination.connections', {'default': fake})
+    assert estimate_count(Vote.objects.all()) == expected
+    [(sql, params)] = fake.fake_cursor.executed
+    assert 'pg_class' in sql
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='planner estimates are PostgreSQL only')
+def test_estimate_count_on_postgresql(sample_competition):
+    Vote.objects.bulk_create(Vote(competition=sample_competition, title=f"T{i % 3}") for i in range(30))
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE core_vote')
+    assert estimate_count(Vote.objects.filter(title='T1')) > 0
+    assert estimate_count(Vote.objects.all()) == 30
@@ -0,0 +1,70 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.utils import OperationalError
+
+from core.management.commands.wait_for_db import wait_for_database
+
+
+class FlakyConnection:
+    def __init__(self, failures):
+        self.failures = failures
+
+    def ensure_connection(self):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError('not yet')
+
+
+def test_wait_for_database_backs_off_exponentially():
+    delays = []
+    wait_for_database(FlakyConnection(4), initial_delay=0.1, max_delay=0.5, sleep=delays.append)
+    assert delays == [0.1, 0.2, 0.4, 0.5]
+
+
+def test_wait_for_database_times_out():
+    with pytest.raises(CommandError):
+        wait_for_database(FlakyConnection(100), timeout=0.05, initial_delay=0.1, sleep=lambda _: None)
+
+
+def _preflight(*args):
+    out = io.StringIO()
+    call_command('preflight', '--skip-migrate', '--skip-superuser', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_preflight_fails_without_static_manifest(db, settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    with pytest.raises(CommandError, match='manifest is missing'):
+        _preflight()
+
+
+def test_preflight_checks_static_manifest(db, settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+
+    first = _preflight('--collectstatic')
+    second = _preflight()
+
+    assert 'collected (manifest was missing)' in first
+    assert (tmp_path / 'staticfiles.json').exists()
+    assert 'manifest present' in second
+    assert 'wait_for_db' in second
+
+
+def test_preflight_refuses_asgi_without_a_pooler(db, settings, tmp_path, monkeypatch):
+    settings.STATIC_ROOT = str(tmp_path)
+    _preflight('--collectstatic')
+    settings.SERVER_INTERFACE = 'asgi'
+    settings.DB_POOLER = ''
+    monkeypatch.setattr(connection, 'vendor', 'postgresql')
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 0)
+
+    with pytest.raises(CommandError, match='PgBouncer'):
+        _preflight()
+    assert 'WARNING: no connection pooler' in _preflight('--allow-no-pooler')
+
+    settings.DB_POOLER = 'pgbouncer'
+    assert 'pooling' in _preflight()
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.middleware import ReplicaStickinessMiddleware
+from core.models import Company, Vote
+from core.routers import PrimaryReplicaRouter, use_primary
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def with_replica(transactional_db, tmp_path):
+    """
+    A real 'replica' alias: a separate SQLite database holding a Company
+    table whose rows differ from the primary's, so a read shows where it went.
+    """
+    default = connections.settings['default']
+    replica = {**default, 'NAME': str(tmp_path / 'replica.sqlite3')}
+    connections.settings['replica'] = connections.configure_settings({'default': default, 'replica': replica})['replica']
+    try:
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(Company)
+        Company.objects.using('replica').create(name='On the replica')
+        Company.objects.create(name='On the primary')
+        yield
+    finally:
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+
+
+def _company_names(queryset):
+    return queryset.db, list(queryset.values_list('name', flat=True))
+
+
+def test_single_database_mode_reads_from_default():
+    assert router.db_for_read(Vote) == 'default'
+    assert router.db_for_write(Vote) == 'default'
+
+
+def test_reads_go_to_replica_outside_transactions(with_replica):
+    assert _company_names(Company.objects.all()) == ('replica', ['On the replica'])
+    with use_primary():
+        assert _company_names(Company.objects.all()) == ('default', ['On the primary'])
+
+
+def test_reads_inside_transactions_stay_on_primary(with_replica):
+    with transaction.atomic():
+        assert _company_names(Company.objects.all()) == ('default', ['On the primary'])
+
+
+def test_replica_is_never_migrated(with_replica):
+    assert router.allow_migrate('replica', 'core') is False
+    assert router.allow_migrate('default', 'core') is None
+
+
+def _middleware(view):
+    return ReplicaStickinessMiddleware(view)
+
+
+def test_writing_request_pins_following_reads(with_replica):
+    seen = []
+
+    def view(request):
+        seen.append(Company.objects.all().db)
+        if request.GET.get('write'):
+            Company.objects.create(name='Written')
+        seen.append(Company.objects.all().db)
+        return HttpResponse()
+
+    factory = RequestFactory()
+    middleware = _middleware(view)
+
+    middleware(factory.get('/'))
+    response = middleware(factory.get('/', {'write': 1}))
+    cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+    follow_up = factory.get('/')
+    follow_up.COOKIES[cookie.key] = cookie.value
+    middleware(follow_up)
+    middleware(factory.post('/'))
+
+    assert seen == ['replica', 'replica', 'replica', 'default', 'default', 'default', 'default', 'default']
+    assert _company_names(Company.objects.order_by('name')) == ('replica', ['On the replica'])
@@ -1,6 +1,71 @@
-from core.models import Competition
+from core.models import Vote
 from core.services import get_winner
+from core.tallies import rebuild_tallies
 
-def test_get_winner(sample_competition):
-    winner = get_winner(sample_competition.id)
-    assert winner == "No winners yet"
\ No newline at end of file
+
+def test_get_winner_without_votes(sample_competition):
+    result = get_winner(sample_competition.id)
+    assert result.winner is None
+    assert result.categories == ()
+    assert result.total_votes == 0
+
+
+def test_get_winner_ignores_votes_without_nominee(sample_vote):
+    result = get_winner(sample_vote.competition_id)
+    assert result.winner is None
+
+
+def test_get_winner_per_category_and_overall(sample_competition, make_users, cast_vote):
+    alice, bob, carol, dave = make_users(4)
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+    cast_vote(sample_competition, "Most Helpful", dave, alice)
+    cast_vote(sample_competition, "Most Helpful", alice, bob)
+    cast_vote(sample_competition, "Best Mentor", carol, bob)
+    cast_vote(sample_competition, "Best Mentor", dave, bob)
+
+    result = get_winner(sample_competition.id)
+
+    assert [c.title for c in result.categories] == ["Best Mentor", "Most Helpful"]
+    mentor, helpful = result.categories
+    assert mentor.winner.username == bob.username
+    assert mentor.total_votes == 2
+    assert helpful.winner.username == alice.username
+    assert helpful.winner.votes == 2
+    assert not helpful.is_tie
+    assert result.winner.nominee_id == bob.id
+    assert result.winner.votes == 3
+    assert result.total_votes == 5
+
+
+def test_get_winner_breaks_ties_by_lowest_nominee_id(sample_competition, make_users, cast_vote):
+    alice, bob, carol, dave = make_users(4)
+    cast_vote(sample_competition, "Most Helpful", carol, bob)
+    cast_vote(sample_competition, "Most Helpful", dave, alice)
+
+    result = get_winner(sample_competition.id)
+
+    assert result.is_tie
+    assert result.categories[0].is_tie
+    assert result.winner.nominee_id == min(alice.id, bob.id)
+
+
+def test_get_winner_query_count_is_independent_of_volume(
+    sample_competition, make_users, django_assert_num_queries
+):
+    users = make_users(60)
+    for size in (3, 60):
+        Vote.objects.filter(competition=sample_competition).delete()
+        Vote.objects.bulk_create(
+            Vote(
+                competition=sample_competition,
+                title=f"Category {i % 3}",
+                voter=users[i],
+                nominee=users[(i * 7) % len(users)],
+            )
+            for i in range(size)
+        )
+        rebuild_tallies([sample_competition.id])
+        # Snapshot lookup, then the tallies.
+        with django_assert_num_queries(2):
+            result = get_winner(sample_competition.id)
+        assert result.total_votes == size
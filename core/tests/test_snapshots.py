@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.models import ResultSnapshot, Vote
+from core.services import aget_winner, get_winner, result_to_dict
+from core.snapshots import take_snapshot, unsnapshotted_competitions
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+@pytest.fixture
+def closed_results(sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+    cast_vote(sample_competition, "Best Mentor", alice, bob)
+    return sample_competition, alice
+
+
+def test_command_snapshots_closed_competitions_once(closed_results, open_competition):
+    competition, alice = closed_results
+    expected = result_to_dict(get_winner(competition.id))
+
+    call_command('snapshot_results', stdout=io.StringIO())
+    call_command('snapshot_results', stdout=io.StringIO())
+
+    snapshot = ResultSnapshot.objects.get()
+    assert snapshot.competition_id == competition.id
+    assert snapshot.total_votes == 3
+    assert snapshot.result == expected
+    assert not unsnapshotted_competitions().exists()
+
+
+def test_get_winner_reads_closed_competitions_from_snapshot(closed_results, django_assert_num_queries):
+    competition, alice = closed_results
+    take_snapshot(competition.id)
+    # Later edits to a closed competition do not change its final results.
+    Vote.objects.filter(competition=competition).delete()
+
+    with django_assert_num_queries(1):
+        result = get_winner(competition.id)
+
+    assert result.winner.nominee_id == alice.id
+    assert result.total_votes == 3
+    assert _await(aget_winner, competition.id) == result
+
+
+def test_results_views_serve_the_stored_snapshot(
+    client, async_client, admin_user, closed_results, django_assert_num_queries
+):
+    competition, alice = closed_results
+    snapshot = take_snapshot(competition.id)
+    client.force_login(admin_user)
+    async_client.force_login(admin_user)
+
+    # Session and user, then the competition with its snapshot.
+    with django_assert_num_queries(3):
+        sync_body = client.get(reverse('core:competition-results', args=[competition.id])).json()
+    async_body = _await(async_client.get, reverse('core:competition-results-async', args=[competition.id])).json()
+
+    assert sync_body == async_body == snapshot.result
+
+
+def test_snapshots_are_immutable(closed_results):
+    competition, _ = closed_results
+    snapshot = take_snapshot(competition.id)
+    snapshot.total_votes = 0
+    with pytest.raises(ValueError):
+        snapshot.save()
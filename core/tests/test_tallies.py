@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.models import Vote, VoteTally
+from core.tallies import diff_tallies, rebuild_tallies
+
+
+def _tally(competition, title, nominee):
+    return VoteTally.objects.get(competition=competition, title=title, nominee=nominee).votes
+
+
+def test_tally_follows_vote_create_update_and_delete(sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    first = cast_vote(sample_competition, "Most Helpful", bob, alice)
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+    assert _tally(sample_competition, "Most Helpful", alice) == 2
+
+    first.nominee = carol
+    first.save()
+    assert _tally(sample_competition, "Most Helpful", alice) == 1
+    assert _tally(sample_competition, "Most Helpful", carol) == 1
+
+    Vote.objects.filter(competition=sample_competition).delete()
+    assert not VoteTally.objects.filter(votes__gt=0).exists()
+    assert diff_tallies() == {}
+
+
+def test_tally_skips_votes_without_nominee(sample_vote):
+    assert not VoteTally.objects.exists()
+
+
+def test_rebuild_repairs_bulk_created_votes(sample_competition, make_users):
+    alice, bob, carol = make_users(3)
+    Vote.objects.bulk_create([
+        Vote(competition=sample_competition, title="Most Helpful", voter=bob, nominee=alice),
+        Vote(competition=sample_competition, title="Most Helpful", voter=carol, nominee=alice),
+    ])
+    assert diff_tallies() == {
+        (sample_competition.id, "Most Helpful", alice.id): (2, 0),
+    }
+
+    assert rebuild_tallies() == 1
+    assert _tally(sample_competition, "Most Helpful", alice) == 2
+
+
+def test_rebuild_tallies_command_check(sample_competition, make_users):
+    alice, bob = make_users(2)
+    Vote.objects.bulk_create([
+        Vote(competition=sample_competition, title="Most Helpful", voter=bob, nominee=alice),
+    ])
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_tallies', '--check')
+    call_command('rebuild_tallies', '--competition', str(sample_competition.id))
+    call_command('rebuild_tallies', '--check')
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.models import Vote
+from core.throttling import TokenBucket, check_vote_rate, known_voted, parse_rate, store_voted
+from core.voting import acast_votes, cast_votes
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+def test_parse_rate():
+    assert parse_rate('30/m') == (30, 60)
+    assert parse_rate('5/second') == (5, 1)
+    assert parse_rate('') is None
+    with pytest.raises(ValueError):
+        parse_rate('often')
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket('test', capacity=3, period=3)
+
+    assert [bucket.consume(now=100) for _ in range(3)] == [0, 0, 0]
+    assert bucket.consume(now=100) == pytest.approx(1.0)
+    # A rejected request does not spend a token: one is back after a second.
+    assert bucket.consume(now=101) == 0
+    assert bucket.consume(now=101) > 0
+    assert [bucket.consume(now=110) for _ in range(3)] == [0, 0, 0]
+
+
+def test_company_bucket_is_shared(settings, make_users):
+    settings.VOTE_THROTTLE_USER = '5/m'
+    settings.VOTE_THROTTLE_COMPANY = '3/m'
+    alice, bob = make_users(2)
+
+    assert [check_vote_rate(alice) for _ in range(2)] == [None, None]
+    assert check_vote_rate(bob) is None
+    assert check_vote_rate(bob) == 20
+    # Refused by the company bucket, so bob's own token was given back.
+    settings.VOTE_THROTTLE_COMPANY = ''
+    assert [check_vote_rate(bob) for _ in range(4)] == [None, None, None, None]
+    assert check_vote_rate(bob) is not None
+
+
+def test_throttled_requests_get_429(client, async_client, settings, make_users, open_competition):
+    settings.VOTE_THROTTLE_USER = '1/m'
+    voter, alice = make_users(2)
+    client.force_login(voter)
+    payload = json.dumps({'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id})
+
+    first = client.post(reverse('core:cast-votes'), payload, content_type='application/json')
+    second = client.post(reverse('core:cast-votes'), payload, content_type='application/json')
+
+    assert first.status_code == 201
+    assert second.status_code == 429
+    assert second['Retry-After'] == '60'
+
+    async_client.force_login(voter)
+    response = _await(
+        async_client.post, reverse('core:cast-votes-async'), payload, content_type='application/json'
+    )
+    assert response.status_code == 429
+
+
+def test_known_duplicates_are_rejected_without_queries(
+    make_users, open_competition, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    voter, alice = make_users(2)
+    item = {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id}
+    with django_capture_on_commit_callbacks(execute=True):
+        result, = cast_votes(voter, [item])
+    assert result['status'] == 'created'
+
+    with django_assert_num_queries(0):
+        result, = cast_votes(voter, [item])
+        async_result, = _await(acast_votes, voter, [item])
+    assert result['errors'] == async_result['errors'] == ['Already voted in this category.']
+
+
+def test_deleting_a_vote_forgets_it(make_users, open_competition, django_capture_on_commit_callbacks):
+    voter, alice = make_users(2)
+    item = {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id}
+    with django_capture_on_commit_callbacks(execute=True):
+        cast_votes(voter, [item])
+    assert known_voted(voter.pk, [open_competition.id]) == {open_competition.id: {'Most Helpful'}}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Vote.objects.get(voter=voter).delete()
+    assert known_voted(voter.pk, [open_competition.id]) == {}
+    result, = cast_votes(voter, [item])
+    assert result['status'] == 'created'
+
+
+def test_stale_voted_sets_are_not_written_back(make_users, open_competition, django_capture_on_commit_callbacks):
+    voter, alice = make_users(2)
+    vote = Vote.objects.create(competition=open_competition, title='Most Helpful', voter=voter, nominee=alice)
+    # A request read the vote from the database just before it was deleted...
+    stale = [(open_competition.id, 'Most Helpful')]
+    with django_capture_on_commit_callbacks(execute=True):
+        vote.delete()
+
+    # ...and stores what it read after the deletion committed.
+    store_voted(voter.pk, stale)
+
+    assert known_voted(voter.pk, [open_competition.id]) == {}
+
+
+def test_admitted_requests_renew_the_bucket_expiry(monkeypatch):
+    bucket = TokenBucket('test', capacity=3, period=3)
+    touched = []
+    monkeypatch.setattr(cache, 'touch', lambda key, timeout: touched.append((key, timeout)))
+
+    for _ in range(4):
+        bucket.consume(now=100)
+
+    # The first request resets the bucket with set; the next two are incr.
+    assert touched == [(bucket.key, bucket.timeout)] * 2
@@ -0,0 +1,57 @@
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from core.models import Company, CustomUser
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+def test_competition_results(client, async_client, sample_competition, make_users, cast_vote):
+    alice, bob, carol = make_users(3)
+    sample_competition.creator = alice
+    sample_competition.save()
+    cast_vote(sample_competition, "Most Helpful", bob, alice)
+    cast_vote(sample_competition, "Most Helpful", carol, alice)
+    client.force_login(bob)
+    async_client.force_login(bob)
+
+    sync_body = client.get(reverse('core:competition-results', args=[sample_competition.id])).json()
+    async_body = _await(
+        async_client.get, reverse('core:competition-results-async', args=[sample_competition.id])
+    ).json()
+
+    assert sync_body == async_body
+    assert sync_body['winner'] == {'nominee': alice.id, 'username': alice.username, 'votes': 2}
+    assert sync_body['categories'][0]['title'] == "Most Helpful"
+
+
+def test_competition_results_unknown_competition(client, async_client, admin_user):
+    client.force_login(admin_user)
+    async_client.force_login(admin_user)
+    assert client.get(reverse('core:competition-results', args=[999])).status_code == 404
+    response = _await(async_client.get, reverse('core:competition-results-async', args=[999]))
+    assert response.status_code == 404
+
+
+def test_competition_results_require_login(client, async_client, sample_competition):
+    for name in ('core:competition-results', 'core:competition-results-async'):
+        response = _await(async_client.get, reverse(name, args=[sample_competition.id]))
+        assert response.status_code == 401
+    assert client.get(reverse('core:competition-results', args=[sample_competition.id])).status_code == 401
+
+
+def test_competition_results_are_limited_to_the_company(client, async_client, sample_competition, make_users):
+    creator, = make_users(1)
+    sample_competition.creator = creator
+    sample_competition.save()
+    outsider = CustomUser.objects.create(username="outsider", company=Company.objects.create(name="Other"))
+    client.force_login(outsider)
+    async_client.force_login(outsider)
+
+    assert client.get(reverse('core:competition-results', args=[sample_competition.id])).status_code == 403
+    response = _await(async_client.get, reverse('core:competition-results-async', args=[sample_competition.id]))
+    assert response.status_code == 403
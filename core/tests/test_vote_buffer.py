@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.models import Vote, VoteTally
+from core.tallies import diff_tallies
+from core.vote_buffer import VoteBuffer, flush, get_buffer
+
+
+@pytest.fixture
+def buffered(settings, tmp_path):
+    settings.VOTE_INGEST_MODE = 'buffered'
+    settings.VOTE_BUFFER_PATH = str(tmp_path / 'votes.sqlite3')
+    return settings.VOTE_BUFFER_PATH
+
+
+@pytest.fixture
+def queued_votes(buffered, client, make_users, open_competition):
+    voter, alice, bob = make_users(3)
+    client.force_login(voter)
+    response = client.post(reverse('core:cast-votes'), json.dumps([
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id},
+        {'competition': open_competition.id, 'title': 'Best Mentor', 'nominee': bob.id},
+    ]), content_type='application/json')
+    assert response.status_code == 202
+    assert response.json()['queued'] == 2
+    return voter, alice, bob
+
+
+def test_buffered_votes_are_queued_until_flushed(queued_votes, open_competition):
+    voter, alice, bob = queued_votes
+    assert not Vote.objects.exists()
+    assert len(get_buffer()) == 2
+
+    call_command('flush_vote_buffer', '--once', stdout=io.StringIO())
+
+    assert set(Vote.objects.values_list('title', 'nominee')) == {('Most Helpful', alice.id), ('Best Mentor', bob.id)}
+    assert VoteTally.objects.get(nominee=alice).votes == 1
+    assert len(get_buffer()) == 0
+
+
+def test_queue_rejects_duplicates(queued_votes, client, open_competition):
+    voter, alice, bob = queued_votes
+    response = client.post(reverse('core:cast-votes'), json.dumps(
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': bob.id}
+    ), content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.json()['results'][0]['errors'] == ['Already voted in this category.']
+    assert len(get_buffer()) == 2
+
+
+def test_flush_crash_after_commit_does_not_double_votes(queued_votes, buffered, monkeypatch):
+    def crash(self, ids):
+        raise RuntimeError('worker killed')
+
+    with monkeypatch.context() as patched:
+        patched.setattr(VoteBuffer, 'remove', crash)
+        with pytest.raises(RuntimeError):
+            flush(get_buffer())
+    assert Vote.objects.count() == 2
+    assert len(get_buffer()) == 2
+
+    # A restarted worker opens the file again and replays the same batch.
+    restarted = VoteBuffer(buffered)
+    assert flush(restarted) == {'created': 0, 'duplicate': 2, 'missing': 0}
+    assert Vote.objects.count() == 2
+    assert diff_tallies() == {}
+    assert len(restarted) == 0
+
+
+def test_flush_crash_before_commit_keeps_votes_queued(queued_votes, buffered, monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError('worker killed')
+
+    with monkeypatch.context() as patched:
+        patched.setattr('core.voting.apply_tally_deltas', crash)
+        with pytest.raises(RuntimeError):
+            flush(get_buffer())
+    assert not Vote.objects.exists()
+
+    restarted = VoteBuffer(buffered)
+    assert len(restarted) == 2
+    assert flush(restarted) == {'created': 2, 'duplicate': 0, 'missing': 0}
+    assert diff_tallies() == {}
+
+
+def test_flush_drops_votes_cast_directly_meanwhile(queued_votes, open_competition):
+    voter, alice, bob = queued_votes
+    Vote.objects.create(competition=open_competition, title='Most Helpful', voter=voter, nominee=bob)
+
+    assert flush(get_buffer()) == {'created': 1, 'duplicate': 1, 'missing': 0}
+    assert Vote.objects.get(title='Most Helpful').nominee == bob
+
+
+def test_flush_counts_votes_for_deleted_users_as_missing(queued_votes, open_competition):
+    voter, alice, bob = queued_votes
+    bob.delete()
+
+    assert flush(get_buffer()) == {'created': 1, 'duplicate': 0, 'missing': 1}
+    assert list(Vote.objects.values_list('nominee', flat=True)) == [alice.id]
+    assert len(get_buffer()) == 0
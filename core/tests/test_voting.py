@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from core.models import Company, Competition, CustomUser, Vote, VoteTally
+from core.tallies import diff_tallies
+
+URL = reverse('core:cast-votes')
+
+
+def _await(method, *args, **kwargs):
+    async def call():
+        return await method(*args, **kwargs)
+    return async_to_sync(call)()
+
+
+def _post(client, payload):
+    return client.post(URL, data=json.dumps(payload), content_type='application/json')
+
+
+@pytest.fixture
+def voter_client(client, make_users):
+    users = make_users(4)
+    client.force_login(users[0])
+    return client, users
+
+
+def test_cast_votes_requires_login(client, db):
+    assert _post(client, {}).status_code == 401
+
+
+def test_cast_single_vote(voter_client, open_competition):
+    client, (voter, alice, *_) = voter_client
+
+    response = _post(client, {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id})
+
+    assert response.status_code == 201
+    result, = response.json()['results']
+    vote = Vote.objects.get(pk=result['id'])
+    assert (vote.voter, vote.nominee) == (voter, alice)
+    assert VoteTally.objects.get(nominee=alice).votes == 1
+
+
+def test_cast_batch_reports_per_item_results(
+    voter_client, open_competition, sample_competition, make_users, django_assert_max_num_queries
+):
+    client, (voter, alice, bob, carol) = voter_client
+    outsider, = make_users(1, prefix='outsider')
+    outsider.company = None
+    outsider.save()
+    sample_competition.company = open_competition.company
+    sample_competition.save()
+    Vote.objects.create(competition=open_competition, title='Best Mentor', voter=voter, nominee=bob)
+    votes = [
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id},
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': bob.id},
+        {'competition': open_competition.id, 'title': 'Best Mentor', 'nominee': alice.id},
+        {'competition': sample_competition.id, 'title': 'Most Helpful', 'nominee': alice.id},
+        {'competition': open_competition.id, 'title': 'Team Player', 'nominee': voter.id},
+        {'competition': open_competition.id, 'title': 'Rookie', 'nominee': outsider.id},
+        {'competition': open_competition.id, 'title': 'Most Fun', 'nominee': carol.id, 'is_public': False},
+    ]
+
+    with django_assert_max_num_queries(12):
+        response = _post(client, {'votes': votes})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r['status'] for r in body['results']] == [
+        'created', 'rejected', 'rejected', 'rejected', 'rejected', 'rejected', 'created',
+    ]
+    assert body['results'][1]['errors'] == ['Already voted in this category.']
+    assert body['results'][3]['errors'] == ['Competition is not open for voting.']
+    assert body['results'][4]['errors'] == ['Cannot vote for yourself.']
+    assert body['results'][5]['errors'] == ['Nominee belongs to another company.']
+    assert body['created'] == 2
+    assert diff_tallies() == {}
+
+
+def test_cast_votes_rejects_malformed_payload(voter_client):
+    client, _ = voter_client
+    response = client.post(URL, data='not json', content_type='application/json')
+    assert response.status_code == 400
+    assert _post(client, []).status_code == 400
+    assert _post(client, [1, 2]).status_code == 400
+
+
+def _apost(async_client, payload):
+    return _await(
+        async_client.post, reverse('core:cast-votes-async'),
+        data=json.dumps(payload), content_type='application/json',
+    )
+
+
+def test_async_cast_votes(async_client, make_users, open_competition):
+    voter, alice, bob = make_users(3)
+    async_client.force_login(voter)
+
+    single = _apost(async_client, {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id})
+    batch = _apost(async_client, [
+        {'competition': open_competition.id, 'title': 'Best Mentor', 'nominee': bob.id},
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': bob.id},
+    ])
+
+    assert single.status_code == 201
+    assert [r['status'] for r in batch.json()['results']] == ['created', 'rejected']
+    assert Vote.objects.filter(voter=voter).count() == 2
+    assert diff_tallies() == {}
+
+
+def test_async_cast_votes_requires_login(async_client, db):
+    assert _apost(async_client, {}).status_code == 401
+
+
+def test_batch_votes_carry_the_competition_company(voter_client, open_competition, sample_company):
+    client, (voter, alice, bob, _) = voter_client
+    open_competition.creator = voter
+    open_competition.save()
+
+    response = _post(client, [
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id},
+        {'competition': open_competition.id, 'title': 'Best Mentor', 'nominee': bob.id},
+    ])
+
+    assert response.status_code == 201
+    assert Vote.objects.for_company(sample_company).count() == 2
+
+
+def test_votes_cannot_cross_into_another_company(voter_client, open_competition):
+    client, (voter, alice, *_) = voter_client
+    other = Company.objects.create(name="Other")
+    foreign = Competition.objects.create(
+        name="Foreign", start_date=open_competition.start_date, end_date=open_competition.end_date, company=other,
+    )
+    stranger = CustomUser.objects.create(username="stranger", company=other)
+
+    body = _post(client, {'votes': [
+        {'competition': foreign.id, 'title': 'Most Helpful', 'nominee': alice.id},
+        {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': stranger.id},
+    ]}).json()
+
+    assert [r['errors'] for r in body['results']] == [
+        ['Competition belongs to another company.'], ['Nominee belongs to another company.'],
+    ]
+    assert not Vote.objects.exists()
+
+
+def test_voters_without_a_company_cannot_vote(client, make_users, open_competition):
+    voter = CustomUser.objects.create(username="freelancer")
+    alice, = make_users(1)
+    client.force_login(voter)
+
+    response = _post(client, {'competition': open_competition.id, 'title': 'Most Helpful', 'nominee': alice.id})
+
+    result, = response.json()['results']
+
+    assert result['errors'] == ['Competition belongs to another company.', 'Nominee belongs to another company.']
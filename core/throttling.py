@@ -0,0 +1,155 @@
+"""
+Edge protection for vote casting, kept entirely in the cache so abusive or
+repeated requests are turned away before they reach the database.
+
+Rate limits are token buckets per user and per company. Each bucket is
+stored as a GCRA "theoretical arrival time" in milliseconds and advanced
+with the cache's atomic incr, so concurrent workers sharing Redis cannot
+overspend it; every admitted request also renews the key's expiry. A bucket
+idle long enough to be full is reset with a plain set; two requests racing
+on that reset may both be admitted.
+
+The "already voted" sets hold, per (competition, voter), titles known to
+be voted. They only ever answer "yes": a missing entry falls through to the
+regular validation, so they are safe to lose. Deleting or editing a vote
+replaces its set with an empty one for VOTED_FORGET_TIMEOUT seconds, and
+sets read from the database are only stored with add, so a read that
+started before the change cannot write the old set back.
+"""
+import math
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import KEY_PREFIX
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+VOTED_TIMEOUT = getattr(settings, 'VOTED_CACHE_TIMEOUT', 3600)
+# Longer than any request takes between reading votes and storing them.
+VOTED_FORGET_TIMEOUT = 60
+
+
+def parse_rate(rate):
+    """'30/m' -> (30, 60). Returns None for an empty rate (no limit)."""
+    if not rate:
+        return None
+    count, _, period = rate.partition('/')
+    try:
+        return int(count), PERIODS[period[:1]]
+    except (KeyError, ValueError):
+        raise ValueError(f'Invalid rate {rate!r}; expected e.g. "30/m".')
+
+
+class TokenBucket:
+    """Up to `capacity` requests at once, refilled at capacity per `period` seconds."""
+
+    def __init__(self, key, capacity, period):
+        self.key = f'{KEY_PREFIX}:throttle:{key}'
+        self.interval = max(1, period * 1000 // capacity)
+        self.limit = capacity * self.interval
+        self.timeout = period + 60
+
+    def consume(self, now=None):
+        """Takes a token. Returns 0 if one was available, else the seconds to wait for one."""
+        now = int((time.time() if now is None else now) * 1000)
+        try:
+            arrival = cache.incr(self.key, self.interval)
+        except ValueError:
+            arrival = None
+        if arrival is None or arrival - self.interval < now:
+            cache.set(self.key, now + self.interval, self.timeout)
+            return 0
+        if arrival - now <= self.limit:
+            # incr keeps the expiry of the last set; renew it so a busy
+            # bucket does not vanish and refill.
+            cache.touch(self.key, self.timeout)
+            return 0
+        cache.decr(self.key, self.interval)
+        return (arrival - now - self.limit) / 1000
+
+    def refund(self):
+        try:
+            cache.decr(self.key, self.interval)
+        except ValueError:
+            pass
+
+
+def vote_buckets(user):
+    buckets = []
+    user_rate = parse_rate(getattr(settings, 'VOTE_THROTTLE_USER', ''))
+    if user_rate:
+        buckets.append(TokenBucket(f'user:{user.pk}', *user_rate))
+    company_rate = parse_rate(getattr(settings, 'VOTE_THROTTLE_COMPANY', ''))
+    if company_rate and user.company_id:
+        buckets.append(TokenBucket(f'company:{user.company_id}', *company_rate))
+    return buckets
+
+
+def check_vote_rate(user):
+    """
+    Spends a token from the user's bucket and their company's. Returns None
+    when the request may go ahead, else the whole seconds to wait (for a
+    Retry-After header). A rejected request gets its tokens back.
+    """
+    spent = []
+    for bucket in vote_buckets(user):
+        wait = bucket.consume()
+        if wait:
+            for previous in spent:
+                previous.refund()
+            return max(1, math.ceil(wait))
+        spent.append(bucket)
+    return None
+
+
+def voted_key(competition_id, voter_id):
+    return f'{KEY_PREFIX}:voted:{competition_id}:{voter_id}'
+
+
+def _by_competition(pairs):
+    titles = defaultdict(set)
+    for competition_id, title in pairs:
+        titles[competition_id].add(title)
+    return titles
+
+
+def known_voted(voter_id, competition_ids):
+    """{competition_id: titles the cache knows `voter_id` voted in}."""
+    keys = {voted_key(c, voter_id): c for c in competition_ids}
+    return {keys[key]: titles for key, titles in cache.get_many(keys).items() if titles}
+
+
+async def aknown_voted(voter_id, competition_ids):
+    keys = {voted_key(c, voter_id): c for c in competition_ids}
+    return {keys[key]: titles for key, titles in (await cache.aget_many(keys)).items() if titles}
+
+
+def store_voted(voter_id, pairs):
+    """
+    Caches the complete set of (competition_id, title) a voter has voted, as
+    read from the database. Sets already cached, or recently forgotten, are
+    left alone.
+    """
+    for competition_id, titles in _by_competition(pairs).items():
+        cache.add(voted_key(competition_id, voter_id), titles, VOTED_TIMEOUT)
+
+
+async def astore_voted(voter_id, pairs):
+    for competition_id, titles in _by_competition(pairs).items():
+        await cache.aadd(voted_key(competition_id, voter_id), titles, VOTED_TIMEOUT)
+
+
+def add_voted(voter_id, pairs):
+    """Adds newly cast (competition_id, title) pairs once the transaction commits."""
+    def add():
+        for competition_id, titles in _by_competition(pairs).items():
+            key = voted_key(competition_id, voter_id)
+            cache.set(key, cache.get(key, set()) | titles, VOTED_TIMEOUT)
+    transaction.on_commit(add)
+
+
+def forget_voted(competition_id, voter_id):
+    transaction.on_commit(lambda: cache.set(voted_key(competition_id, voter_id), set(), VOTED_FORGET_TIMEOUT))
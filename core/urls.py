@@ -0,0 +1,23 @@
+from django.urls import path
+
+from core import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('votes/', views.cast_votes_view, name='cast-votes'),
+    path('competitions/', views.competition_list_view, name='competitions'),
+    path('competitions/<int:competition_id>/results/', views.competition_results_view, name='competition-results'),
+    path('competitions/<int:competition_id>/votes/', views.competition_votes_view, name='competition-votes'),
+    path('competitions/<int:competition_id>/export/', views.competition_export_view, name='competition-export'),
+    path('companies/<int:company_id>/users/', views.company_users_view, name='company-users'),
+    path('companies/<int:company_id>/nominees/', views.company_nominees_view, name='company-nominees'),
+    path('competitions/<int:competition_id>/live/', views.competition_live_view, name='competition-live'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('async/votes/', views.acast_votes_view, name='cast-votes-async'),
+    path(
+        'async/competitions/<int:competition_id>/results/',
+        views.acompetition_results_view,
+        name='competition-results-async',
+    ),
+]
@@ -0,0 +1,45 @@
+"""
+Version counters behind the ETag and Last-Modified headers of the read
+endpoints: Competition.results_version moves with the competition's
+tallies and Company.directory_version with the company's users. Live
+result events carry the results_version their change produced.
+
+Counters are bumped inside the writer's transaction, so a reader never
+sees new data under an old version. Rows are updated in id order to keep
+lock acquisition consistent between concurrent writers.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Company, Competition
+
+
+def _ids(values):
+    return sorted({value for value in values if value is not None})
+
+
+def bump_results_version(competition_ids):
+    """
+    Returns {competition_id: new results_version}. The bumped rows stay
+    locked until the transaction ends, so the versions read back are the
+    ones this write produced.
+    """
+    ids = _ids(competition_ids)
+    if not ids:
+        return {}
+    competitions = Competition.objects.filter(pk__in=ids)
+    competitions.update(results_version=F('results_version') + 1, results_updated_at=timezone.now())
+    return dict(competitions.values_list('pk', 'results_version'))
+
+
+def bump_directory_version(company_ids):
+    ids = _ids(company_ids)
+    if ids:
+        Company.objects.filter(pk__in=ids).update(
+            directory_version=F('directory_version') + 1, directory_updated_at=timezone.now(),
+        )
+
+
+def etag(*parts):
+    """Strong ETag built from the parts that identify one representation."""
+    return '"{}"'.format('-'.join(str(part) for part in parts))
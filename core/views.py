@@ -1,4 +1,437 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_POST
+
+from core import metrics
+from core.cache import cache_stats
+from core.exports import EXPORTS, FORMATS, abatched_lines, batched_lines, export_lines
+from core.models import ArchivedVote, Company, Competition, CustomUser, Vote
+from core.live import broker, ensure_listener, sse_event
+from core.nominees import DEFAULT_LIMIT as NOMINEE_LIMIT, get_index
+from core.pagination import InvalidCursor, chained_keyset_page, parse_limit
+from core.services import (
+    active_competitions_state, aget_cached_winner, aget_versioned_winner, get_active_competitions, get_cached_winner,
+    result_to_dict,
+)
+from core.throttling import check_vote_rate
+from core.vote_buffer import buffer_votes, buffering_enabled
+from core.versions import etag
+from core.voting import InvalidPayload, acast_votes, cast_votes, parse_vote_items, save_votes
 
 def index_view(request):
-    return render(request, 'index.html')
\ No newline at end of file
+    return render(request, 'index.html')
+
+
+def _json_error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _with_validators(response, tag, last_modified=None, private=False):
+    response['ETag'] = tag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Clients may keep the body but must revalidate it on every use.
+    patch_cache_control(response, no_cache=True, **({'private': True} if private else {}))
+    return response
+
+
+def _not_modified(request, tag, last_modified=None, private=False):
+    """
+    The 304 (or 412) answer to a conditional request whose validators still
+    match, else None. Views call it right after reading their version
+    counter, before any query that builds the body.
+    """
+    response = get_conditional_response(
+        request, etag=tag, last_modified=last_modified and int(last_modified.timestamp()),
+    )
+    return response and _with_validators(response, tag, last_modified, private)
+
+
+def _read_vote_items(request):
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        raise InvalidPayload('Request body must be valid JSON.')
+    return parse_vote_items(payload)
+
+
+def _throttled_response(retry_after):
+    response = _json_error('Too many requests.', 429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _save_function():
+    return buffer_votes if buffering_enabled() else save_votes
+
+
+def _votes_response(results):
+    created = sum(1 for r in results if r['status'] == 'created')
+    queued = sum(1 for r in results if r['status'] == 'queued')
+    if queued:
+        status = 202
+    else:
+        status = 201 if created == len(results) else 200
+    return JsonResponse(
+        {'created': created, 'queued': queued, 'rejected': len(results) - created - queued, 'results': results},
+        status=status,
+    )
+
+
+@require_POST
+def cast_votes_view(request):
+    """
+    Casts one vote or a batch of votes for the logged-in user. Accepts a vote
+    object, a list of them, or {"votes": [...]}, and answers with one result
+    per item. Rate limited per user and company (see core.throttling).
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    retry_after = check_vote_rate(request.user)
+    if retry_after:
+        return _throttled_response(retry_after)
+    try:
+        items = _read_vote_items(request)
+    except InvalidPayload as exc:
+        return _json_error(str(exc), 400)
+    return _votes_response(cast_votes(request.user, items, save=_save_function()))
+
+
+def _results_query(competition_id):
+    # One query tells apart unknown, open and snapshotted competitions and
+    # reads the company to authorize on and the version the ETag is built from.
+    return Competition.objects.filter(pk=competition_id).values_list(
+        'company_id', 'results_version', 'results_updated_at', 'result_snapshot__result',
+    )
+
+
+def _results_validators(competition_id, version, updated_at):
+    return etag('results', competition_id, version), updated_at
+
+
+@require_GET
+def competition_results_view(request, competition_id):
+    """
+    Results of a competition, for staff and members of its company; closed
+    ones are served as stored in their snapshot. Answers conditional
+    requests with 304 while no vote changed.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    row = _results_query(competition_id).first()
+    if row is None:
+        return _json_error('Competition not found.', 404)
+    company_id, version, updated_at, snapshot = row
+    if not _can_see_company(request.user, company_id):
+        return _json_error('Forbidden.', 403)
+    validators = _results_validators(competition_id, version, updated_at)
+    not_modified = _not_modified(request, *validators, private=True)
+    if not_modified:
+        return not_modified
+    body = snapshot if snapshot is not None else result_to_dict(get_cached_winner(competition_id, version))
+    return _with_validators(JsonResponse(body), *validators, private=True)
+
+
+@require_GET
+def competition_list_view(request):
+    """
+    Competitions open for voting today: all of them for staff, the user's
+    company's otherwise. The ETag and Last-Modified come from one aggregate
+    over the listed competitions, so every instance agrees on them; the
+    cached list is keyed by the same state.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    today = timezone.localdate()
+    scope = 'all' if request.user.is_staff else request.user.company_id
+    state = active_competitions_state(today)
+    count, updated_at = state
+    validators = etag(
+        'competitions', today.isoformat(), count, int(updated_at.timestamp() * 1e6) if updated_at else 0, scope,
+    ), updated_at
+    not_modified = _not_modified(request, *validators, private=True)
+    if not_modified:
+        return not_modified
+    competitions = get_active_competitions(today, state)
+    if not request.user.is_staff:
+        competitions = [c for c in competitions if _can_see_company(request.user, c['company_id'])]
+    return _with_validators(JsonResponse({'results': competitions}), *validators, private=True)
+
+
+def _can_see_company(user, company_id):
+    return user.is_staff or (company_id is not None and user.company_id == company_id)
+
+
+def _keyset_response(request, *querysets):
+    try:
+        rows, next_cursor = chained_keyset_page(
+            querysets, request.GET.get('cursor'), parse_limit(request.GET.get('limit'))
+        )
+    except InvalidCursor as exc:
+        return _json_error(str(exc), 400)
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
+
+@require_GET
+def competition_votes_view(request, competition_id):
+    """
+    Lists a competition's votes with keyset pagination (?cursor=&limit=),
+    archived ones first (they are always the oldest). Staff see every vote;
+    members of the competition's company only the public ones.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    competition = Competition.objects.filter(pk=competition_id).values('company_id').first()
+    if competition is None:
+        return _json_error('Competition not found.', 404)
+    if not _can_see_company(request.user, competition['company_id']):
+        return _json_error('Forbidden.', 403)
+
+    sources = []
+    for model in (ArchivedVote, Vote):
+        votes = model.objects.filter(competition_id=competition_id)
+        if not request.user.is_staff:
+            votes = votes.filter(is_public=True)
+        sources.append(votes.values(
+            'id', 'title', 'is_public', 'voter_id', 'voter__username', 'nominee_id', 'nominee__username',
+        ))
+    return _keyset_response(request, *sources)
+
+
+@require_GET
+def company_users_view(request, company_id):
+    """
+    Lists the users of a company with keyset pagination (?cursor=&limit=).
+    Conditional requests get a 304 while the company's directory is unchanged.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    if not _can_see_company(request.user, company_id):
+        return _json_error('Forbidden.', 403)
+    company = Company.objects.filter(pk=company_id).values('directory_version', 'directory_updated_at').first()
+    if company is None:
+        return _json_error('Company not found.', 404)
+    # The cursor and limit are part of the URL, so the version alone tells pages apart.
+    validators = etag('users', company_id, company['directory_version']), company['directory_updated_at']
+    not_modified = _not_modified(request, *validators, private=True)
+    if not_modified:
+        return not_modified
+    users = CustomUser.objects.for_company(company_id).filter(is_active=True)
+    response = _keyset_response(request, users.values('id', 'username', 'first_name', 'last_name', 'role'))
+    if response.status_code != 200:
+        return response
+    return _with_validators(response, *validators, private=True)
+
+
+@require_GET
+def company_nominees_view(request, company_id):
+    """
+    Autocomplete for picking a nominee: ?q=<prefix>&limit=<k> returns the
+    company's active users whose username or any word of their name starts
+    with the prefix (case and accents ignored), leaving out the caller.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Authentication required.', 401)
+    if not _can_see_company(request.user, company_id):
+        return _json_error('Forbidden.', 403)
+    try:
+        limit = parse_limit(request.GET.get('limit'), default=NOMINEE_LIMIT)
+    except InvalidCursor as exc:
+        return _json_error(str(exc), 400)
+    company = Company.objects.filter(pk=company_id).values('directory_version', 'directory_updated_at').first()
+    if company is None:
+        return _json_error('Company not found.', 404)
+    version = company['directory_version']
+    validators = etag('nominees', company_id, version, request.user.pk), company['directory_updated_at']
+    not_modified = _not_modified(request, *validators, private=True)
+    if not_modified:
+        return not_modified
+    index = get_index(company_id, version)
+    if index.version != version:
+        # The index is being rebuilt elsewhere; describe what was served.
+        validators = etag('nominees', company_id, index.version, request.user.pk), None
+    results = index.search(request.GET.get('q', ''), limit, exclude=(request.user.pk,))
+    return _with_validators(JsonResponse({'results': results}), *validators, private=True)
+
+
+@require_GET
+def competition_export_view(request, competition_id):
+    """
+    Streams a competition's votes or results for staff:
+    ?kind=votes|results&format=csv|ndjson.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return _json_error('Staff access required.', 403)
+    kind = request.GET.get('kind', 'votes')
+    fmt = request.GET.get('format', 'csv')
+    if kind not in EXPORTS or fmt not in FORMATS:
+        return _json_error('Unknown export kind or format.', 400)
+    if not Competition.objects.filter(pk=competition_id).exists():
+        return _json_error('Competition not found.', 404)
+
+    lines = export_lines(competition_id, kind, fmt)
+    stream = abatched_lines(lines) if isinstance(request, ASGIRequest) else batched_lines(lines)
+    response = StreamingHttpResponse(stream, content_type=FORMATS[fmt][1])
+    response['Content-Disposition'] = f'attachment; filename="competition-{competition_id}-{kind}.{fmt}"'
+    return response
+
+
+def _has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Request and cache metrics of this process in the Prometheus text format,
+    for staff or a scraper sending the METRICS_TOKEN bearer token.
+    """
+    if not _has_metrics_token(request) and not request.user.is_staff:
+        return _json_error('Forbidden.', 403)
+    cache_counters = [
+        (('cache_requests_total', (('name', name), ('event', event))), value)
+        for name, events in cache_stats().items()
+        for event, value in events.items()
+    ]
+    return HttpResponse(
+        metrics.registry.render(cache_counters), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# Async variants, served natively when running under ASGI (config.asgi).
+# Django 4.2's method decorators and request.user are sync-only, so both are
+# handled inline here.
+
+async def _aget_user(request):
+    def resolve():
+        return request.user if request.user.is_authenticated else None
+    return await sync_to_async(resolve)()
+
+
+async def acast_votes_view(request):
+    if request.method != 'POST':
+        return _json_error('Method not allowed.', 405)
+    user = await _aget_user(request)
+    if user is None:
+        return _json_error('Authentication required.', 401)
+    retry_after = await sync_to_async(check_vote_rate, thread_sensitive=False)(user)
+    if retry_after:
+        return _throttled_response(retry_after)
+    try:
+        items = _read_vote_items(request)
+    except InvalidPayload as exc:
+        return _json_error(str(exc), 400)
+    return _votes_response(await acast_votes(user, items, save=_save_function()))
+
+
+def _release_connection():
+    # A stream only reads the database for its snapshots; give the
+    # connection back in between instead of holding it for the whole stream.
+    # The next snapshot reconnects.
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+async def competition_live_view(request, competition_id):
+    """
+    Server-Sent Events stream of a competition's results: a `snapshot` event
+    with the full results, then one `tally` event per committed change
+    (title, nominee and vote delta) and a comment line as heartbeat. A new
+    snapshot is sent if the client falls too far behind. Snapshots and
+    changes carry the competition's results_version; changes already
+    included in the last snapshot are not sent. Only served under
+    ASGI, where an open stream does not hold a worker thread. Same access
+    rules as the results endpoints.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return _json_error('Method not allowed.', 405)
+    if not isinstance(request, ASGIRequest):
+        return _json_error('Live results need the ASGI server.', 501)
+    user = await _aget_user(request)
+    if user is None:
+        return _json_error('Authentication required.', 401)
+    competition = await Competition.objects.filter(pk=competition_id).values('company_id').afirst()
+    if competition is None:
+        return _json_error('Competition not found.', 404)
+    if not _can_see_company(user, competition['company_id']):
+        return _json_error('Forbidden.', 403)
+
+    ensure_listener()
+    heartbeat = settings.LIVE_RESULTS_HEARTBEAT
+
+    async def stream():
+        # Django 4.2 does not notice disconnected clients while streaming, so
+        # streams end after LIVE_RESULTS_MAX_SECONDS; EventSource reconnects.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LIVE_RESULTS_MAX_SECONDS
+        # Subscribe before the snapshot so no change can fall in between;
+        # changes the snapshot already counts are then told apart by version.
+        subscription = broker.subscribe(competition_id)
+
+        async def snapshot(sequence):
+            version, result = await aget_versioned_winner(competition_id)
+            await sync_to_async(_release_connection)()
+            return version, sse_event('snapshot', {**result_to_dict(result), 'version': version}, sequence)
+
+        try:
+            sequence = 0
+            yield 'retry: 1000\n\n'
+            version, event = await snapshot(sequence)
+            yield event
+            while loop.time() < deadline:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), min(heartbeat, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    if loop.time() < deadline:
+                        yield ': heartbeat\n\n'
+                    continue
+                if subscription.overflowed:
+                    subscription.drain()
+                    sequence += 1
+                    version, event = await snapshot(sequence)
+                    yield event
+                elif event.get('version') is None or event['version'] > version:
+                    # Versions from concurrent writers may arrive out of
+                    # order, so only the snapshot's version filters.
+                    sequence += 1
+                    yield sse_event('tally', event, sequence)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def acompetition_results_view(request, competition_id):
+    if request.method not in ('GET', 'HEAD'):
+        return _json_error('Method not allowed.', 405)
+    user = await _aget_user(request)
+    if user is None:
+        return _json_error('Authentication required.', 401)
+    row = await _results_query(competition_id).afirst()
+    if row is None:
+        return _json_error('Competition not found.', 404)
+    company_id, version, updated_at, snapshot = row
+    if not _can_see_company(user, company_id):
+        return _json_error('Forbidden.', 403)
+    validators = _results_validators(competition_id, version, updated_at)
+    not_modified = _not_modified(request, *validators, private=True)
+    if not_modified:
+        return not_modified
+    body = snapshot if snapshot is not None else result_to_dict(await aget_cached_winner(competition_id, version))
+    return _with_validators(JsonResponse(body), *validators, private=True)
@@ -0,0 +1,209 @@
+"""
+Write-behind buffer for votes, used when VOTE_INGEST_MODE is 'buffered'.
+
+Validated votes are appended to a local SQLite database in WAL mode with
+synchronous=FULL, so a vote is on disk by the time append() returns and
+the client is only answered 202 after that. The flush_vote_buffer command
+moves queued votes to the main database in bulk_create batches through
+save_votes, which keeps tallies and caches up to date.
+
+Flushing is idempotent: queued votes whose (competition, voter, title)
+already exists are dropped as duplicates instead of inserted, so a worker
+that dies after the main database committed, but before the buffer forgot
+the batch, flushes the same rows again without doubling them. Votes whose
+competition, voter or nominee was deleted while they were queued are
+dropped as 'missing'.
+
+The buffer lives on local disk: every instance that accepts buffered votes
+needs a persistent volume and its own flush worker.
+"""
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from core.models import Competition, CustomUser, Vote
+from core.routers import use_primary
+from core.throttling import add_voted
+from core.voting import DUPLICATE_ERROR, save_votes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_vote (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    competition_id INTEGER NOT NULL,
+    voter_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    nominee_id INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    award TEXT NOT NULL,
+    is_public INTEGER NOT NULL,
+    queued_at REAL NOT NULL,
+    UNIQUE (competition_id, voter_id, title)
+);
+"""
+FIELDS = ('competition_id', 'voter_id', 'title', 'nominee_id', 'description', 'award', 'is_public')
+DELETE_CHUNK_SIZE = 500
+
+
+class VoteBuffer:
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=FULL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _write(self, statements):
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            results = [connection.execute(sql, params) for sql, params in statements]
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return results
+
+    def append(self, votes):
+        """
+        Durably queues unsaved Vote instances in one transaction. Returns the
+        queue id of each vote, or None where the same voter already has a
+        vote for that competition and title in the queue.
+        """
+        now = time.time()
+        sql = (
+            f"INSERT OR IGNORE INTO queued_vote ({', '.join(FIELDS)}, queued_at) "
+            f"VALUES ({', '.join('?' * len(FIELDS))}, ?)"
+        )
+        cursors = self._write(
+            (sql, [getattr(vote, field) for field in FIELDS] + [now]) for vote in votes
+        )
+        return [cursor.lastrowid if cursor.rowcount else None for cursor in cursors]
+
+    def pending(self, limit):
+        """The oldest `limit` queued votes as (queue id, field dict) pairs."""
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(FIELDS)} FROM queued_vote ORDER BY id LIMIT ?", (limit,)
+        )
+        return [(row[0], dict(zip(FIELDS, row[1:]))) for row in rows]
+
+    def remove(self, ids):
+        ids = list(ids)
+        self._write(
+            (f"DELETE FROM queued_vote WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            for chunk in (ids[i:i + DELETE_CHUNK_SIZE] for i in range(0, len(ids), DELETE_CHUNK_SIZE))
+        )
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM queued_vote').fetchone()[0]
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def buffering_enabled():
+    return getattr(settings, 'VOTE_INGEST_MODE', 'direct') == 'buffered'
+
+
+def get_buffer():
+    path = str(settings.VOTE_BUFFER_PATH)
+    with _buffers_lock:
+        if path not in _buffers:
+            _buffers[path] = VoteBuffer(path)
+        return _buffers[path]
+
+
+def buffer_votes(votes, results, buffer=None):
+    """
+    Buffered counterpart of save_votes: queues the validated votes and fills
+    in their results as 'queued', or 'rejected' for duplicates of votes
+    still in the queue.
+    """
+    if not votes:
+        return results
+    buffer = buffer or get_buffer()
+    queued = []
+    for vote, queue_id in zip(votes, buffer.append(votes)):
+        index = vote._result_index
+        if queue_id is None:
+            results[index] = {'index': index, 'status': 'rejected', 'errors': [DUPLICATE_ERROR]}
+        else:
+            results[index] = {'index': index, 'status': 'queued', 'queue_id': queue_id}
+            queued.append((vote.competition_id, vote.title))
+    add_voted(votes[0].voter_id, queued)
+    return results
+
+
+def _key(vote):
+    return vote.competition_id, vote.voter_id, vote.title
+
+
+def _stored_keys(votes):
+    return set(
+        Vote.objects.filter(
+            voter_id__in={vote.voter_id for vote in votes},
+            competition_id__in={vote.competition_id for vote in votes},
+        ).values_list('competition_id', 'voter_id', 'title')
+    )
+
+
+def flush(buffer, batch_size=500):
+    """
+    Moves up to `batch_size` queued votes to the main database. Returns
+    counts of 'created', 'duplicate' and 'missing' (competition, voter or
+    nominee deleted) votes; an empty Counter when the queue is empty.
+    """
+    rows = buffer.pending(batch_size)
+    if not rows:
+        return Counter()
+    votes = []
+    for index, (_, fields) in enumerate(rows):
+        vote = Vote(**fields)
+        vote._result_index = index
+        votes.append(vote)
+
+    with use_primary():
+        companies = dict(
+            Competition.objects.filter(pk__in={vote.competition_id for vote in votes}).values_list('pk', 'company_id')
+        )
+        users = set(CustomUser.objects.filter(
+            pk__in={user_id for vote in votes for user_id in (vote.voter_id, vote.nominee_id)}
+        ).values_list('pk', flat=True))
+        for vote in votes:
+            vote.company_id = companies.get(vote.competition_id)
+        existing = _stored_keys(votes)
+        fresh = [
+            vote for vote in votes
+            if _key(vote) not in existing
+            and vote.competition_id in companies and vote.voter_id in users and vote.nominee_id in users
+        ]
+        results = save_votes(fresh, [None] * len(votes))
+        if any(results[vote._result_index]['status'] != 'created' for vote in fresh):
+            # Lost to a vote cast directly, or to a deletion, since the reads above.
+            existing = _stored_keys(votes)
+    buffer.remove(queue_id for queue_id, _ in rows)
+
+    counts = Counter(created=0, duplicate=0, missing=0)
+    for vote, result in zip(votes, results):
+        if result and result['status'] == 'created':
+            counts['created'] += 1
+        else:
+            counts['duplicate' if _key(vote) in existing else 'missing'] += 1
+    return counts
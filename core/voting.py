@@ -0,0 +1,251 @@
+from collections import Counter, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.cache import invalidate_competition_cache
+from core.models import Competition, CustomUser, Vote
+from core.tallies import apply_tally_deltas, tally_key
+from core.throttling import add_voted, aknown_voted, astore_voted, known_voted, store_voted
+
+MAX_BATCH_SIZE = getattr(settings, 'VOTES_MAX_BATCH_SIZE', 500)
+DUPLICATE_ERROR = 'Already voted in this category.'
+OTHER_COMPANY_ERROR = 'Competition belongs to another company.'
+
+VOTE_FIELDS = ('competition', 'title', 'nominee', 'description', 'award', 'is_public')
+
+
+class InvalidPayload(ValueError):
+    pass
+
+
+def parse_vote_items(payload):
+    """
+    Accepts a single vote object, a list of them, or {"votes": [...]} and
+    returns the list of vote dicts.
+    """
+    if isinstance(payload, dict) and 'votes' in payload:
+        payload = payload['votes']
+    items = payload if isinstance(payload, list) else [payload]
+    if not items:
+        raise InvalidPayload('No votes given.')
+    if len(items) > MAX_BATCH_SIZE:
+        raise InvalidPayload(f'At most {MAX_BATCH_SIZE} votes per request.')
+    if not all(isinstance(item, dict) for item in items):
+        raise InvalidPayload('Every vote must be a JSON object.')
+    return items
+
+
+def _as_id(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class VoteBatch:
+    """
+    Validates a batch of vote dicts cast by one voter. The lookups it needs
+    (competitions, nominees, votes already cast) are loaded with one query
+    each, so validation cost does not grow with the number of round trips.
+    """
+
+    def __init__(self, voter, items):
+        self.voter = voter
+        self.items = items
+        self.competition_ids = {_as_id(i.get('competition')) for i in items} - {None}
+        self.nominee_ids = {_as_id(i.get('nominee')) for i in items} - {None}
+
+    def competitions_query(self):
+        return Competition.objects.filter(pk__in=self.competition_ids).only('start_date', 'end_date', 'company_id')
+
+    def nominees_query(self):
+        return CustomUser.objects.filter(pk__in=self.nominee_ids, is_active=True).values_list('pk', 'company_id')
+
+    def already_voted_query(self):
+        return Vote.objects.filter(
+            voter=self.voter, competition_id__in=self.competition_ids
+        ).values_list('competition_id', 'title')
+
+    def load(self):
+        self.competitions = {c.pk: c for c in self.competitions_query()}
+        self.nominees = dict(self.nominees_query())
+        self.already_voted = set(self.already_voted_query())
+        store_voted(self.voter.pk, self.already_voted)
+
+    async def aload(self):
+        self.competitions = {c.pk: c async for c in self.competitions_query().aiterator()}
+        self.nominees = {pk: company_id async for pk, company_id in self.nominees_query()}
+        self.already_voted = {row async for row in self.already_voted_query()}
+        await astore_voted(self.voter.pk, self.already_voted)
+
+    def known_duplicates(self, voted):
+        """
+        Rejections for a batch made only of votes that `voted` (see
+        core.throttling.known_voted) says were already cast, so it can be
+        answered without a query. None if any item needs a real check.
+        """
+        results = []
+        for index, item in enumerate(self.items):
+            title = item.get('title')
+            if not isinstance(title, str) or title.strip() not in voted.get(_as_id(item.get('competition')), ()):
+                return None
+            results.append({'index': index, 'status': 'rejected', 'errors': [DUPLICATE_ERROR]})
+        return results
+
+    def validate(self, today=None):
+        """
+        Returns (votes, results): unsaved Vote instances for the valid items
+        and one result dict per item, in input order. Valid items keep a
+        placeholder result until save_votes fills in their id.
+        """
+        today = today or timezone.localdate()
+        seen = set(self.already_voted)
+        votes, results = [], []
+        for index, item in enumerate(self.items):
+            errors = self._item_errors(item, today, seen)
+            if errors:
+                results.append({'index': index, 'status': 'rejected', 'errors': errors})
+                continue
+            vote = Vote(
+                competition_id=_as_id(item['competition']),
+                company_id=self.competitions[_as_id(item['competition'])].company_id,
+                title=item['title'].strip(),
+                nominee_id=_as_id(item['nominee']),
+                voter=self.voter,
+                description=item.get('description') or '',
+                award=item.get('award') or '',
+                is_public=item.get('is_public', True),
+            )
+            seen.add((vote.competition_id, vote.title))
+            vote._result_index = index
+            votes.append(vote)
+            results.append({'index': index, 'status': 'pending'})
+        return votes, results
+
+    def _item_errors(self, item, today, seen):
+        errors = []
+        unknown = set(item) - set(VOTE_FIELDS)
+        if unknown:
+            errors.append(f"Unknown fields: {', '.join(sorted(unknown))}.")
+
+        competition = self.competitions.get(_as_id(item.get('competition')))
+        if competition is None:
+            errors.append('Competition does not exist.')
+        elif competition.company_id is None or competition.company_id != self.voter.company_id:
+            # Same rule as the results views: only the competition's company takes part.
+            errors.append(OTHER_COMPANY_ERROR)
+        elif not competition.start_date <= today <= competition.end_date:
+            errors.append('Competition is not open for voting.')
+
+        title = item.get('title')
+        if not isinstance(title, str) or not title.strip():
+            errors.append('Title is required.')
+        elif len(title.strip()) > Vote._meta.get_field('title').max_length:
+            errors.append('Title is too long.')
+        elif competition is not None and (competition.pk, title.strip()) in seen:
+            errors.append(DUPLICATE_ERROR)
+
+        nominee_id = _as_id(item.get('nominee'))
+        if nominee_id not in self.nominees:
+            errors.append('Nominee does not exist.')
+        elif nominee_id == self.voter.pk:
+            errors.append('Cannot vote for yourself.')
+        elif self.nominees[nominee_id] is None or self.nominees[nominee_id] != self.voter.company_id:
+            errors.append('Nominee belongs to another company.')
+
+        for field in ('description', 'award'):
+            if not isinstance(item.get(field, ''), str):
+                errors.append(f'{field.capitalize()} must be a string.')
+        if not isinstance(item.get('is_public', True), bool):
+            errors.append('is_public must be a boolean.')
+        return errors
+
+
+def save_votes(votes, results):
+    """
+    Inserts the validated votes with a single bulk_create and updates their
+    tallies in the same transaction. If a concurrent request inserted a
+    conflicting vote, falls back to one savepoint per vote so that only the
+    duplicates are rejected.
+    """
+    if not votes:
+        return results
+    try:
+        with transaction.atomic():
+            created = Vote.objects.bulk_create(votes)
+            apply_tally_deltas(Counter(filter(None, map(tally_key, created))))
+            for competition_id in {vote.competition_id for vote in created}:
+                invalidate_competition_cache(competition_id)
+            voted = defaultdict(list)
+            for vote in created:
+                voted[vote.voter_id].append((vote.competition_id, vote.title))
+            for voter_id, pairs in voted.items():
+                add_voted(voter_id, pairs)
+        accepted = created
+    except IntegrityError:
+        for vote in votes:
+            vote.pk = None
+            vote._state.adding = True
+        accepted = []
+        for vote in votes:
+            try:
+                vote.save()
+                accepted.append(vote)
+            except IntegrityError:
+                results[vote._result_index] = {
+                    'index': vote._result_index,
+                    'status': 'rejected',
+                    'errors': [DUPLICATE_ERROR],
+                }
+    for vote in accepted:
+        results[vote._result_index] = {'index': vote._result_index, 'status': 'created', 'id': vote.pk}
+    return results
+
+
+def cast_votes(voter, items, save=save_votes):
+    """
+    Validates a batch of votes and stores the valid ones with `save`
+    (save_votes, or core.vote_buffer.buffer_votes to queue them), returning
+    one result per item.
+    """
+    batch = VoteBatch(voter, items)
+    duplicates = batch.known_duplicates(known_voted(voter.pk, batch.competition_ids))
+    if duplicates is not None:
+        return duplicates
+    batch.load()
+    votes, results = batch.validate()
+    return save(votes, results)
+
+
+async def acast_votes(voter, items, save=save_votes):
+    """
+    Async variant of cast_votes. Lookups use the async ORM; with save_votes
+    a single vote is stored with acreate, a batch goes through save_votes in
+    a worker thread since transactions are not available to async code.
+    Other `save` functions always run in a worker thread.
+    """
+    batch = VoteBatch(voter, items)
+    duplicates = batch.known_duplicates(await aknown_voted(voter.pk, batch.competition_ids))
+    if duplicates is not None:
+        return duplicates
+    await batch.aload()
+    votes, results = batch.validate()
+    if len(votes) != 1 or save is not save_votes:
+        return await sync_to_async(save)(votes, results)
+
+    vote, = votes
+    fields = {f.attname: getattr(vote, f.attname) for f in Vote._meta.concrete_fields if not f.primary_key}
+    try:
+        created = await Vote.objects.acreate(**fields)
+    except IntegrityError:
+        results[vote._result_index] = {
+            'index': vote._result_index, 'status': 'rejected', 'errors': [DUPLICATE_ERROR],
+        }
+    else:
+        results[vote._result_index] = {'index': vote._result_index, 'status': 'created', 'id': created.pk}
+    return results
@@ -5,23 +5,105 @@ set -e
 
 echo "Starting Django application..."
 
-# Wait for database to be ready
-echo "Waiting for database..."
-python manage.py wait_for_db
+# Under ASGI Django opens a PostgreSQL connection per request (CONN_MAX_AGE=0,
+# see config/settings.py). Unless DB_POOLER names an external PgBouncer
+# ('pgbouncer') or opts out ('none'), the image's own PgBouncer pools them on
+# 127.0.0.1:6432. LISTEN/NOTIFY for live results keeps using the database.
+if [ "${SERVER_INTERFACE:-asgi}" = "asgi" ] && [ "${DB_POOLER:-bundled}" = "bundled" ]; then
+    echo "Starting bundled PgBouncer..."
+    pgbouncer_dir=$(mktemp -d)
+    # auth_file lines are "user" "password", with double quotes doubled.
+    printf '"%s" "%s"\n' \
+        "$(printf '%s' "${DB_USER:-challenger_user}" | sed 's/"/""/g')" \
+        "$(printf '%s' "${DB_PASSWORD:-challenger_password}" | sed 's/"/""/g')" \
+        > "$pgbouncer_dir/userlist.txt"
+    cat > "$pgbouncer_dir/pgbouncer.ini" <<INI
+[databases]
+* = host=${DB_HOST:-db} port=${DB_PORT:-5432}
 
-# Run migrations
-echo "Running migrations..."
-python manage.py migrate
+[pgbouncer]
+listen_addr = 127.0.0.1
+listen_port = 6432
+unix_socket_dir =
+auth_type = md5
+auth_file = $pgbouncer_dir/userlist.txt
+pool_mode = transaction
+default_pool_size = ${PGBOUNCER_POOL_SIZE:-10}
+max_client_conn = 1000
+ignore_startup_parameters = extra_float_digits
+INI
+    chmod 600 "$pgbouncer_dir/userlist.txt"
+    chown -R pgbouncer "$pgbouncer_dir"
+    # PgBouncer refuses to run as root.
+    runuser -u pgbouncer -- pgbouncer "$pgbouncer_dir/pgbouncer.ini" &
+    export LIVE_RESULTS_LISTEN_HOST="${LIVE_RESULTS_LISTEN_HOST:-${DB_HOST:-db}}"
+    export LIVE_RESULTS_LISTEN_PORT="${LIVE_RESULTS_LISTEN_PORT:-${DB_PORT:-5432}}"
+    export DB_HOST=127.0.0.1 DB_PORT=6432 DB_POOLER=pgbouncer
+fi
 
-# Create superuser if it doesn't exist
-echo "Checking for superuser..."
-python manage.py create_superuser_if_not_exists
-
-# Collect static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+# Wait for the database, migrate and ensure a superuser in a single Django
+# process; it also fails fast if the image was built without static files,
+# or if ASGI would run against PostgreSQL without a connection pooler.
+echo "Running preflight..."
+if [ "${DB_POOLER:-}" = "none" ]; then
+    python manage.py preflight --allow-no-pooler
+else
+    python manage.py preflight
+fi
 
 # Start the application
-echo "Starting Gunicorn..."
-exec gunicorn config.wsgi:application --bind 0.0.0.0:8080
+# SERVER_INTERFACE=asgi (default) serves async views natively through uvicorn
+# workers; SERVER_INTERFACE=wsgi falls back to plain sync workers.
+if [ "${SERVER_INTERFACE:-asgi}" = "wsgi" ]; then
+    echo "Starting Gunicorn (WSGI)..."
+    set -- gunicorn config.wsgi:application --bind 0.0.0.0:8080
+else
+    echo "Starting Gunicorn (ASGI)..."
+    set -- gunicorn config.asgi:application --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8080
+fi
+
+if [ "${VOTE_INGEST_MODE:-direct}" != "buffered" ]; then
+    exec "$@"
+fi
+
+# Buffered vote ingestion queues votes on local disk; the flush worker has to
+# run next to the web server that fills the queue. It is restarted if it
+# dies, and on SIGTERM it finishes its current batch before exiting.
+flush_worker() {
+    stopping=0
+    worker=
+    trap 'stopping=1; kill -TERM "$worker" 2>/dev/null || true' TERM
+    while [ "$stopping" = 0 ]; do
+        python manage.py flush_vote_buffer &
+        worker=$!
+        # A trapped signal interrupts wait; keep waiting for the final flush.
+        while kill -0 "$worker" 2>/dev/null; do
+            wait "$worker" || true
+        done
+        if [ "$stopping" = 0 ]; then
+            echo "Vote buffer flush worker exited; restarting..."
+            sleep 1
+        fi
+    done
+}
+
+echo "Starting vote buffer flush worker..."
+flush_worker &
+flusher=$!
+
+"$@" &
+server=$!
+trap 'kill -TERM "$server" "$flusher" 2>/dev/null || true' TERM INT
+
+status=0
+wait "$server" || status=$?
+# A trapped signal interrupts wait; wait again for the graceful shutdown.
+while kill -0 "$server" 2>/dev/null; do
+    status=0
+    wait "$server" || status=$?
+done
+# The server is gone (stopped or crashed): let the worker flush what is queued.
+kill -TERM "$flusher" 2>/dev/null || true
+wait "$flusher" || true
+exit "$status"
 